@@ -1,10 +1,24 @@
+import gzip
+import hashlib
+import heapq
+import mimetypes
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from functools import wraps
-from typing import Any, Dict, List, Optional
+from operator import itemgetter
+from typing import Any, Dict, List, Optional, Tuple
 
 from dotenv import load_dotenv
 from flask import Flask, jsonify, request, send_from_directory
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from db import (
     init_db,
@@ -20,6 +34,7 @@ from db import (
     mark_notifications_seen,
     add_audit_log,
     get_faction_member_access,
+    list_faction_members,
     upsert_faction_member_access,
     set_faction_member_enabled,
     delete_faction_member_access,
@@ -44,22 +59,79 @@ from torn_members import member_live_bars
 from torn_war import ranked_war_summary
 from torn_enemies import hospital_members_from_enemies, enemy_faction_members, split_enemy_buckets
 from torn_shared import profile_url, attack_url, bounty_url
+from torn_shared import to_float as _to_float, to_int as _to_int
 
 load_dotenv()
 
 APP_NAME = "War Hub"
 DEFAULT_REFRESH_SECONDS = int(os.getenv("DEFAULT_REFRESH_SECONDS", "30"))
-ALLOWED_SCRIPT_ORIGINS = {"https://www.torn.com", "https://torn.com", ""}
-
-app = Flask(__name__, static_folder="static")
-
-
-def BASE_URL() -> str:
-    return str(os.getenv("PUBLIC_BASE_URL", "")).strip()
+CACHE_TTL_STATE = int(os.getenv("CACHE_TTL_STATE", "5"))
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "8"))
+BAR_FETCH_WORKERS = int(os.getenv("BAR_FETCH_WORKERS", "4"))
+GZIP_MIN_BYTES = int(os.getenv("GZIP_MIN_BYTES", "1024"))
+PUBLIC_BASE_URL = str(os.getenv("PUBLIC_BASE_URL", "")).strip()
+ALLOWED_SCRIPT_ORIGINS = frozenset({"https://www.torn.com", "https://torn.com", ""})
+ALLOWED_REFERER_PREFIXES = ("https://www.torn.com", "https://torn.com") + ((PUBLIC_BASE_URL,) if PUBLIC_BASE_URL else ())
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    def dumps_bytes(self, obj: Any) -> bytes:
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return self.dumps_bytes(obj).decode("utf-8")
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        # jsonify() would go bytes -> str -> bytes through dumps(); hand the
+        # orjson bytes to the response as they are.
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj) + b"\n", mimetype=self.mimetype)
+
+
+# /static is served by static_files below so the userscript can go out
+# precompressed; Flask's built-in static route would shadow it.
+app = Flask(__name__, static_folder=None)
+if orjson is not None:
+    app.json = OrjsonProvider(app)
+# Clients read fields by name, so skip sorting every object's keys.
+app.json.sort_keys = False
+app.json.compact = True
+
+_EXECUTOR = ThreadPoolExecutor(max_workers=max(1, FETCH_WORKERS), thread_name_prefix="warhub-fetch")
+# Member bar lookups are one Torn call per stored key, so a roster queues
+# dozens at once; they get their own pool to keep the war fetches behind
+# /api/state from waiting on them.
+_BAR_EXECUTOR = ThreadPoolExecutor(max_workers=max(1, BAR_FETCH_WORKERS), thread_name_prefix="warhub-bars")
+_STATE_CACHE: Dict[str, Dict[str, Any]] = {}
+_LIVE_SUMMARY_CACHE: Dict[str, Dict[str, Any]] = {}
+_FACTION_MEMBERS_CACHE: Dict[str, Dict[str, Any]] = {}
+_STATE_CACHE_LOCK = threading.Lock()
+# Bumped per user and per faction by _invalidate_state_cache. A build that
+# started before a write sees a different generation when it finishes and
+# does not publish its now stale body (same idea as db.py's cache versions).
+_STATE_GENERATIONS: Dict[str, int] = {}
+
+
+# The ISO string only changes once a second, so it is rebuilt on the tick
+# rather than on every response. One tuple keeps the pair consistent
+# across threads without a lock.
+_utc_now_cached = (0, "")
 
 
 def utc_now() -> str:
-    return datetime.now(timezone.utc).isoformat()
+    global _utc_now_cached
+    now = int(time.time())
+    cached = _utc_now_cached
+    if cached[0] != now:
+        cached = (now, datetime.fromtimestamp(now, timezone.utc).isoformat())
+        _utc_now_cached = cached
+    return cached[1]
 
 
 def ok(data: Optional[Dict[str, Any]] = None, **kwargs):
@@ -76,24 +148,6 @@ def err(message: str, status: int = 400, **kwargs):
     return jsonify(payload), status
 
 
-def _to_int(value: Any, default: int = 0) -> int:
-    try:
-        if value in (None, ""):
-            return default
-        return int(value)
-    except Exception:
-        return default
-
-
-def _to_float(value: Any, default: float = 0.0) -> float:
-    try:
-        if value in (None, ""):
-            return default
-        return float(value)
-    except Exception:
-        return default
-
-
 def _safe_bool(value: Any) -> bool:
     if isinstance(value, bool):
         return value
@@ -125,8 +179,7 @@ def _require_json() -> Dict[str, Any]:
         return data
     if request.data:
         try:
-            import json
-            parsed = json.loads(request.data.decode("utf-8"))
+            parsed = app.json.loads(request.data)
             if isinstance(parsed, dict):
                 return parsed
         except Exception:
@@ -139,38 +192,62 @@ def _check_request_origin() -> bool:
     referer = str(request.headers.get("Referer", "")).strip()
     if origin and origin not in ALLOWED_SCRIPT_ORIGINS:
         return False
-    allowed_prefixes = ("https://www.torn.com", "https://torn.com")
-    if BASE_URL():
-        allowed_prefixes = allowed_prefixes + (BASE_URL(),)
-    if referer and not any(referer.startswith(x) for x in allowed_prefixes):
+    if referer and not referer.startswith(ALLOWED_REFERER_PREFIXES):
         return False
     return True
 
 
+_CORS_HEADERS = (
+    ("Access-Control-Allow-Headers", "Content-Type, Authorization, X-Session-Token, X-License-Admin"),
+    ("Access-Control-Allow-Methods", "GET, POST, DELETE, OPTIONS"),
+)
+
+
 def with_cors(resp):
-    resp.headers["Access-Control-Allow-Origin"] = request.headers.get("Origin", "*") or "*"
-    resp.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization, X-Session-Token, X-License-Admin"
-    resp.headers["Access-Control-Allow-Methods"] = "GET, POST, DELETE, OPTIONS"
+    headers = resp.headers
+    headers["Access-Control-Allow-Origin"] = request.headers.get("Origin") or "*"
+    for name, value in _CORS_HEADERS:
+        headers[name] = value
     return resp
 
 
+def _maybe_gzip(resp):
+    resp.vary.add("Accept-Encoding")
+    if resp.direct_passthrough or resp.status_code != 200 or "Content-Encoding" in resp.headers:
+        return resp
+    if resp.mimetype not in ("application/json", "text/html"):
+        return resp
+    if not request.accept_encodings["gzip"]:
+        return resp
+    body = resp.get_data()
+    if len(body) < GZIP_MIN_BYTES:
+        return resp
+    resp.set_data(gzip.compress(body, compresslevel=6))
+    resp.headers["Content-Encoding"] = "gzip"
+    return resp
+
+
+# Every response, preflights included, gets its CORS headers here; routes
+# should not call with_cors themselves.
 @app.after_request
 def _after(resp):
-    return with_cors(resp)
+    return with_cors(_maybe_gzip(resp))
 
 
 @app.route("/api/<path:_path>", methods=["OPTIONS"])
 @app.route("/<path:_path>", methods=["OPTIONS"])
 def api_options(_path: str):
-    return with_cors(ok(message="ok"))
+    return ok(message="ok")
 
 
 def _session_user():
+    # The userscript sends X-Session-Token, so check the headers before the
+    # query string; request.args is only parsed when neither header is set.
     token = str(request.headers.get("Authorization", "")).replace("Bearer ", "").strip()
-    if not token:
-        token = str(request.args.get("token", "")).strip()
     if not token:
         token = str(request.headers.get("X-Session-Token", "")).strip()
+    if not token:
+        token = str(request.args.get("token", "")).strip()
     if not token:
         return None, None
     sess = get_session(token)
@@ -187,7 +264,7 @@ def require_session(fn):
     @wraps(fn)
     def wrapper(*args, **kwargs):
         if request.method == "OPTIONS":
-            return with_cors(ok(message="ok"))
+            return ok(message="ok")
         if not _check_request_origin():
             return err("Blocked request origin.", 403)
         sess, user = _session_user()
@@ -199,7 +276,7 @@ def require_session(fn):
     return wrapper
 
 
-def _owner_ids() -> set:
+def _owner_ids() -> frozenset:
     raw = str(os.getenv("OWNER_USER_IDS", "")).strip()
     out = {"3679030"}
     if raw:
@@ -210,10 +287,10 @@ def _owner_ids() -> set:
     owner_id = str(os.getenv("OWNER_USER_ID", "")).strip()
     if owner_id:
         out.add(owner_id)
-    return out
+    return frozenset(out)
 
 
-def _owner_names() -> set:
+def _owner_names() -> frozenset:
     raw = str(os.getenv("OWNER_NAMES", "")).strip()
     out = set()
     if raw:
@@ -225,7 +302,13 @@ def _owner_names() -> set:
     if owner_name:
         out.add(owner_name)
     out.add("fries91")
-    return out
+    return frozenset(out)
+
+
+# Owner lists only come from the environment, so build them once at import
+# instead of re-reading and re-splitting the env vars on every session check.
+OWNER_USER_IDS = _owner_ids()
+OWNER_NAMES = _owner_names()
 
 
 def _session_is_owner(user: Optional[Dict[str, Any]]) -> bool:
@@ -233,19 +316,21 @@ def _session_is_owner(user: Optional[Dict[str, Any]]) -> bool:
         return False
     uid = str(user.get("user_id") or "").strip()
     name = str(user.get("name") or "").strip().lower()
-    return (uid and uid in _owner_ids()) or (name and name in _owner_names())
+    return (uid and uid in OWNER_USER_IDS) or (name and name in OWNER_NAMES)
+
+
+_MANAGEMENT_POSITIONS = frozenset({"leader", "co-leader", "co leader", "coleader"})
 
 
 def _is_faction_management_role(api_key: str, user_id: str, faction_id: str) -> bool:
     if not api_key or not user_id or not faction_id:
         return False
+    user_id = str(user_id)
     try:
         faction = faction_basic(api_key, faction_id=faction_id) or {}
         for m in faction.get("members") or []:
-            mid = str(m.get("user_id") or m.get("id") or "").strip()
-            pos = str(m.get("position") or "").strip().lower()
-            if mid == str(user_id):
-                return pos in {"leader", "co-leader", "co leader", "coleader"}
+            if str(m.get("user_id") or m.get("id") or "").strip() == user_id:
+                return str(m.get("position") or "").strip().lower() in _MANAGEMENT_POSITIONS
     except Exception:
         return False
     return False
@@ -254,11 +339,12 @@ def _is_faction_management_role(api_key: str, user_id: str, faction_id: str) ->
 def _can_manage_faction(user: Dict[str, Any], faction_id: str) -> bool:
     if _session_is_owner(user):
         return True
-    user_id = str((user or {}).get("user_id") or "").strip()
+    user = user or {}
+    user_id = str(user.get("user_id") or "").strip()
     faction_id = str(faction_id or "").strip()
     if not user_id or not faction_id:
         return False
-    return _is_faction_management_role(str((user or {}).get("api_key") or ""), user_id, faction_id)
+    return _is_faction_management_role(str(user.get("api_key") or ""), user_id, faction_id)
 
 
 def _feature_access_for_user(user: Dict[str, Any]) -> Dict[str, Any]:
@@ -417,16 +503,30 @@ def _build_live_faction_members(user: Dict[str, Any], return_debug: bool = False
                 })
 
     stored_users = get_user_map_by_faction(faction_id)
-    access_cache: Dict[str, Dict[str, Any]] = {}
+    # One query for the whole faction instead of one per member row.
+    access_rows = {
+        str(row.get("member_user_id") or "").strip(): row
+        for row in list_faction_members(faction_id)
+    }
     out_by_user_id: Dict[str, Dict[str, Any]] = {}
-
-    def _access_row_for(member_user_id: str) -> Dict[str, Any]:
-        member_user_id = str(member_user_id or "").strip()
-        if not member_user_id:
-            return {}
-        if member_user_id not in access_cache:
-            access_cache[member_user_id] = get_faction_member_access(faction_id, member_user_id) or {}
-        return access_cache[member_user_id]
+    viewer_user_id = str(user.get("user_id") or "")
+    viewer_api_key = str(user.get("api_key") or "")
+
+    def _member_api_key(member_user_id: str) -> str:
+        stored_api_key = str((stored_users.get(member_user_id) or {}).get("api_key") or "")
+        if member_user_id == viewer_user_id:
+            return viewer_api_key or stored_api_key
+        return stored_api_key
+
+    # Every stored key is its own Torn call, so the bars are fetched side by
+    # side on the bar pool rather than one member after another.
+    bar_futures = {}
+    for member_user_id in [m["user_id"] for m in live_members] + [str(k or "").strip() for k in (stored_users or {})]:
+        member_api_key = _member_api_key(member_user_id)
+        if member_user_id and member_api_key and member_user_id not in bar_futures:
+            bar_futures[member_user_id] = _BAR_EXECUTOR.submit(
+                _build_member_bar_payload, {"user_id": member_user_id}, member_api_key
+            )
 
     def _build_output_row(base_member: Dict[str, Any], source_label: str) -> Optional[Dict[str, Any]]:
         member_user_id = str(base_member.get("user_id") or "").strip()
@@ -434,14 +534,19 @@ def _build_live_faction_members(user: Dict[str, Any], return_debug: bool = False
             return None
 
         stored_user = stored_users.get(member_user_id) or {}
-        access_row = _access_row_for(member_user_id)
+        access_row = access_rows.get(member_user_id) or {}
 
-        member_api_key = str(stored_user.get("api_key") or "")
-        if member_user_id == str(user.get("user_id") or ""):
-            member_api_key = str(user.get("api_key") or "") or member_api_key
+        is_viewer = member_user_id == viewer_user_id
+        member_api_key = _member_api_key(member_user_id)
 
-        live_bar_payload = _build_member_bar_payload({"user_id": member_user_id}, api_key=member_api_key)
+        bar_future = bar_futures.get(member_user_id)
+        if bar_future is not None:
+            live_bar_payload = bar_future.result()
+        else:
+            live_bar_payload = _build_member_bar_payload({"user_id": member_user_id}, api_key=member_api_key)
         live_bars = live_bar_payload.get("bars") or {}
+        medical_cooldown = _to_int(live_bar_payload.get("medical_cooldown"), 0) or _to_int(base_member.get("medical_cooldown"), 0)
+        booster_cooldown = _to_int(live_bar_payload.get("booster_cooldown"), 0)
 
         name = str(
             base_member.get("name")
@@ -468,13 +573,13 @@ def _build_live_faction_members(user: Dict[str, Any], return_debug: bool = False
             "energy": live_bars.get("energy") or base_member.get("energy") or {},
             "nerve": live_bars.get("nerve") or base_member.get("nerve") or {},
             "happy": live_bars.get("happy") or base_member.get("happy") or {},
-            "medical_cooldown": _to_int(live_bar_payload.get("medical_cooldown"), 0) or _to_int(base_member.get("medical_cooldown"), 0),
-            "medical_cooldown_text": _seconds_to_text(_to_int(live_bar_payload.get("medical_cooldown"), 0) or _to_int(base_member.get("medical_cooldown"), 0)),
-            "booster_cooldown": _to_int(live_bar_payload.get("booster_cooldown"), 0),
-            "booster_cooldown_text": _seconds_to_text(_to_int(live_bar_payload.get("booster_cooldown"), 0)),
+            "medical_cooldown": medical_cooldown,
+            "medical_cooldown_text": _seconds_to_text(medical_cooldown),
+            "booster_cooldown": booster_cooldown,
+            "booster_cooldown_text": _seconds_to_text(booster_cooldown),
             "live_bar_debug": live_bar_payload.get("debug") or {},
         }
-        if member_user_id == str(user.get("user_id") or ""):
+        if is_viewer:
             row["online_state"] = "online"
             row["status"] = "Online"
             row["status_detail"] = ""
@@ -661,7 +766,8 @@ def _build_enemy_payload(user: Dict[str, Any], war_payload: Optional[Dict[str, A
     ]
 
     items = _store_enemy_predictions(my_faction_id, resolved_enemy_faction_id, list(items))
-    buckets = split_enemy_buckets(items)
+    # items keep build_enemy_cards order, which is already name order per state.
+    buckets = split_enemy_buckets(items, presorted=True)
     counts_by_state = {key: len(buckets.get(key) or []) for key in _enemy_bucket_order()}
 
     return {
@@ -806,9 +912,16 @@ def _build_chain_payload(user: Dict[str, Any], war: Optional[Dict[str, Any]] = N
     faction_id = str(user.get("faction_id") or "").strip()
     user_id = str(user.get("user_id") or "").strip()
     rows = list_chain_statuses(faction_id) if faction_id else []
-    mine = next((r for r in rows if str(r.get("user_id") or "") == user_id), {})
-    available_items = [r for r in rows if _safe_bool(r.get("available"))]
-    sitter_items = [r for r in rows if _safe_bool(r.get("sitter_enabled"))]
+    mine: Dict[str, Any] = {}
+    available_items = []
+    sitter_items = []
+    for r in rows:
+        if not mine and str(r.get("user_id") or "") == user_id:
+            mine = r
+        if _safe_bool(r.get("available")):
+            available_items.append(r)
+        if _safe_bool(r.get("sitter_enabled")):
+            sitter_items.append(r)
     war = war or {}
 
     return {
@@ -834,35 +947,50 @@ def _build_med_deals_payload(user: Dict[str, Any]) -> Dict[str, Any]:
     return {"items": rows, "count": len(rows), "text": text}
 
 
+def _build_war_chain_payloads(user: Dict[str, Any]):
+    war = _build_war_payload(user)
+    enemy_payload = _build_enemy_payload(user, war)
+    hospital_payload = _build_hospital_payload(user, war, enemy_payload)
+    return war, enemy_payload, hospital_payload
+
+
 def _build_state_payload(user: Dict[str, Any]) -> Dict[str, Any]:
     user = user or {}
     faction_id = str(user.get("faction_id") or "").strip()
     faction_name = str(user.get("faction_name") or "").strip()
 
-    access = _feature_access_for_user(user)
-    war = _build_war_payload(user) if faction_id else {}
-    enemy_payload = _build_enemy_payload(user, war) if faction_id else {
-        "items": [],
-        "count": 0,
-        "enemy_faction_id": "",
-        "enemy_faction_name": "",
-        "buckets": _empty_enemy_buckets(),
-        "counts_by_state": {key: 0 for key in _enemy_bucket_order()},
-        "order": _enemy_bucket_order(),
-        "war_ref": {},
-    }
-    hospital_payload = _build_hospital_payload(user, war, enemy_payload) if faction_id else {
-        "items": [],
-        "count": 0,
-        "overview_items": [],
-        "overview_count": 0,
-        "enemy_faction_id": "",
-        "enemy_faction_name": "",
-    }
+    # The war/enemy/hospital chain is the slow Torn round-trip; run it on the
+    # worker pool so the sqlite reads below overlap with it.
+    war_future = _EXECUTOR.submit(_build_war_chain_payloads, user) if faction_id else None
 
+    access = _feature_access_for_user(user)
     notifications = list_notifications(str(user.get("user_id") or ""), limit=25)
-    terms_summary_row = get_faction_terms_summary(faction_id) if faction_id else {}
+    terms_summary_row = (get_faction_terms_summary(faction_id) or {}) if faction_id else {}
     med_deals_payload = _build_med_deals_payload(user)
+
+    if war_future is not None:
+        war, enemy_payload, hospital_payload = war_future.result()
+    else:
+        war = {}
+        enemy_payload = {
+            "items": [],
+            "count": 0,
+            "enemy_faction_id": "",
+            "enemy_faction_name": "",
+            "buckets": _empty_enemy_buckets(),
+            "counts_by_state": {key: 0 for key in _enemy_bucket_order()},
+            "order": _enemy_bucket_order(),
+            "war_ref": {},
+        }
+        hospital_payload = {
+            "items": [],
+            "count": 0,
+            "overview_items": [],
+            "overview_count": 0,
+            "enemy_faction_id": "",
+            "enemy_faction_name": "",
+        }
+
     chain_payload = _build_chain_payload(user, war)
 
     return {
@@ -891,10 +1019,10 @@ def _build_state_payload(user: Dict[str, Any]) -> Dict[str, Any]:
             "show_admin": bool(access.get("show_admin")),
         },
         "terms_summary": {
-            "text": str((terms_summary_row or {}).get("text") or ""),
-            "updated_by_user_id": str((terms_summary_row or {}).get("updated_by_user_id") or ""),
-            "updated_by_name": str((terms_summary_row or {}).get("updated_by_name") or ""),
-            "updated_at": str((terms_summary_row or {}).get("updated_at") or ""),
+            "text": str(terms_summary_row.get("text") or ""),
+            "updated_by_user_id": str(terms_summary_row.get("updated_by_user_id") or ""),
+            "updated_by_name": str(terms_summary_row.get("updated_by_name") or ""),
+            "updated_at": str(terms_summary_row.get("updated_at") or ""),
         },
         "med_deals": med_deals_payload,
         "chain": chain_payload,
@@ -902,6 +1030,102 @@ def _build_state_payload(user: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+def _serialize_ok(payload: Dict[str, Any]) -> bytes:
+    body = {"ok": True, **payload}
+    if isinstance(app.json, OrjsonProvider):
+        return app.json.dumps_bytes(body) + b"\n"
+    return (app.json.dumps(body) + "\n").encode("utf-8")
+
+
+def _state_cache_entry(user: Dict[str, Any], body: bytes, expires_at: float) -> Dict[str, Any]:
+    return {
+        "faction_id": str(user.get("faction_id") or "").strip(),
+        "expires_at": expires_at,
+        "body": body,
+        "etag": hashlib.blake2b(body, digest_size=8).hexdigest(),
+    }
+
+
+def _state_generation(user: Dict[str, Any]) -> Tuple[int, int]:
+    return (
+        _STATE_GENERATIONS.get("user:" + str(user.get("user_id") or "").strip(), 0),
+        _STATE_GENERATIONS.get("faction:" + str(user.get("faction_id") or "").strip(), 0),
+    )
+
+
+def _cached_state(user: Dict[str, Any]) -> Dict[str, Any]:
+    user = user or {}
+    user_id = str(user.get("user_id") or "").strip()
+    if not user_id or CACHE_TTL_STATE <= 0:
+        return _state_cache_entry(user, _serialize_ok(_build_state_payload(user)), 0.0)
+
+    # Entries are never mutated once published, only replaced or dropped under
+    # the lock, so readers can take the current one without locking.
+    now = time.monotonic()
+    entry = _STATE_CACHE.get(user_id)
+    if entry and entry["expires_at"] > now:
+        return entry
+
+    generation = _state_generation(user)
+    entry = _state_cache_entry(user, _serialize_ok(_build_state_payload(user)), now + CACHE_TTL_STATE)
+    with _STATE_CACHE_LOCK:
+        for key in [k for k, v in _STATE_CACHE.items() if v["expires_at"] <= now]:
+            _STATE_CACHE.pop(key, None)
+        if _state_generation(user) == generation:
+            _STATE_CACHE[user_id] = entry
+    return entry
+
+
+def _state_gzip_body(user_id: str, entry: Dict[str, Any]) -> bytes:
+    body = entry.get("gzip_body")
+    if body is None:
+        body = gzip.compress(entry["body"], compresslevel=6)
+        # Publish a copy carrying the compressed body, unless the entry was
+        # replaced or invalidated while compressing.
+        with _STATE_CACHE_LOCK:
+            if _STATE_CACHE.get(user_id) is entry:
+                _STATE_CACHE[user_id] = {**entry, "gzip_body": body}
+    return body
+
+
+def _invalidate_state_cache(faction_id: str = "", user_id: str = ""):
+    faction_id = str(faction_id or "").strip()
+    user_id = str(user_id or "").strip()
+    with _STATE_CACHE_LOCK:
+        if user_id:
+            _STATE_GENERATIONS["user:" + user_id] = _STATE_GENERATIONS.get("user:" + user_id, 0) + 1
+        if faction_id:
+            _STATE_GENERATIONS["faction:" + faction_id] = _STATE_GENERATIONS.get("faction:" + faction_id, 0) + 1
+        for cache in (_STATE_CACHE, _LIVE_SUMMARY_CACHE, _FACTION_MEMBERS_CACHE):
+            for key, entry in list(cache.items()):
+                if (user_id and key == user_id) or (faction_id and entry.get("faction_id") == faction_id):
+                    cache.pop(key, None)
+
+
+def _cached_live_summary(user: Dict[str, Any]) -> Dict[str, Any]:
+    user_id = str(user.get("user_id") or "").strip()
+    if not user_id or CACHE_TTL_STATE <= 0:
+        return _live_summary_payload(user)
+
+    now = time.monotonic()
+    entry = _LIVE_SUMMARY_CACHE.get(user_id)
+    if entry and entry["expires_at"] > now:
+        return entry["payload"]
+
+    generation = _state_generation(user)
+    payload = _live_summary_payload(user)
+    with _STATE_CACHE_LOCK:
+        for key in [k for k, v in _LIVE_SUMMARY_CACHE.items() if v["expires_at"] <= now]:
+            _LIVE_SUMMARY_CACHE.pop(key, None)
+        if _state_generation(user) == generation:
+            _LIVE_SUMMARY_CACHE[user_id] = {
+                "faction_id": str(user.get("faction_id") or "").strip(),
+                "expires_at": now + CACHE_TTL_STATE,
+                "payload": payload,
+            }
+    return payload
+
+
 def _summary_member_row(member: Dict[str, Any], member_stats_map: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
     user_id = str(member.get("user_id") or member.get("id") or "").strip()
     name = str(member.get("name") or member.get("user_name") or "Player").strip() or "Player"
@@ -951,8 +1175,7 @@ def _extract_first_list(payload: Dict[str, Any], *keys: str) -> List[Dict[str, A
 def _top_name(rows: List[Dict[str, Any]], key: str, default: str = "—") -> str:
     if not rows:
         return default
-    ranked = sorted(rows, key=lambda r: r.get(key) or 0, reverse=True)
-    top = ranked[0] if ranked else {}
+    top = max(rows, key=lambda r: r.get(key) or 0)
     if not top or not (top.get(key) or 0):
         return default
     return f"{top.get('name') or 'Player'} [{top.get('user_id') or ''}]".strip()
@@ -962,8 +1185,11 @@ def _live_summary_payload(user: Dict[str, Any]) -> Dict[str, Any]:
     faction_id = str(user.get("faction_id") or "").strip()
     faction_name = str(user.get("faction_name") or "").strip()
 
+    # The roster and the ranked war are independent Torn calls; fetch the war
+    # on the worker pool while the roster loads here.
+    war_future = _EXECUTOR.submit(_build_war_payload, user) if faction_id else None
     members = _build_live_faction_members(user) if faction_id else []
-    war = _build_war_payload(user) if faction_id else {}
+    war = war_future.result() if war_future is not None else {}
 
     member_stats_source = _extract_first_list(
         war,
@@ -981,28 +1207,34 @@ def _live_summary_payload(user: Dict[str, Any]) -> Dict[str, Any]:
     member_stats_map = {str(item.get("user_id") or item.get("id") or ""): item for item in member_stats_source}
 
     rows = [_summary_member_row(member, member_stats_map) for member in members]
-    rows.sort(
-        key=lambda r: (
-            (r.get("net_impact") or 0),
-            (r.get("respect_gain") or 0),
-            (r.get("hits") or 0),
-        ),
-        reverse=True,
-    )
-
-    total_respect_gain = round(sum(_to_float(r.get("respect_gain"), 0.0) for r in rows), 2)
-    total_respect_lost = round(sum(_to_float(r.get("respect_lost"), 0.0) for r in rows), 2)
-    total_hits = sum(_to_int(r.get("hits"), 0) for r in rows)
-    total_hits_taken = sum(_to_int(r.get("hits_taken"), 0) for r in rows)
+    # Rows come from _summary_member_row, so the numeric fields are always
+    # set and the sort keys can be read with C-level itemgetters.
+    rows.sort(key=itemgetter("net_impact", "respect_gain", "hits"), reverse=True)
+
+    # Total the numeric fields and collect no-shows in one pass.
+    total_respect_gain = 0.0
+    total_respect_lost = 0.0
+    total_hits = 0
+    total_hits_taken = 0
+    no_shows = []
+    for r in rows:
+        total_respect_gain += r["respect_gain"]
+        total_respect_lost += r["respect_lost"]
+        total_hits += r["hits"]
+        total_hits_taken += r["hits_taken"]
+        if r["no_show"]:
+            no_shows.append(r)
+    total_respect_gain = round(total_respect_gain, 2)
+    total_respect_lost = round(total_respect_lost, 2)
     net_impact = round(total_respect_gain - total_respect_lost, 2)
 
-    no_shows = [r for r in rows if r.get("no_show")]
-    top_hitters = sorted(rows, key=lambda r: ((r.get("hits") or 0), (r.get("respect_gain") or 0)), reverse=True)
-    top_respect_gain = sorted(rows, key=lambda r: ((r.get("respect_gain") or 0), (r.get("hits") or 0)), reverse=True)
-    top_respect_lost = sorted(rows, key=lambda r: ((r.get("respect_lost") or 0), (r.get("hits_taken") or 0)), reverse=True)
-    top_hits_taken = sorted(rows, key=lambda r: ((r.get("hits_taken") or 0), (r.get("respect_lost") or 0)), reverse=True)
-    top_net_impact = sorted(rows, key=lambda r: ((r.get("net_impact") or 0), (r.get("respect_gain") or 0)), reverse=True)
-    best_efficiency = sorted(rows, key=lambda r: ((r.get("efficiency") or 0), (r.get("respect_gain") or 0)), reverse=True)
+    # Only the top five of each ranking is ever sent.
+    top_hitters = heapq.nlargest(5, rows, key=itemgetter("hits", "respect_gain"))
+    top_respect_gain = heapq.nlargest(5, rows, key=itemgetter("respect_gain", "hits"))
+    top_respect_lost = heapq.nlargest(5, rows, key=itemgetter("respect_lost", "hits_taken"))
+    top_hits_taken = heapq.nlargest(5, rows, key=itemgetter("hits_taken", "respect_lost"))
+    top_net_impact = heapq.nlargest(5, rows, key=itemgetter("net_impact", "respect_gain"))
+    best_efficiency = heapq.nlargest(5, rows, key=itemgetter("efficiency", "respect_gain"))
 
     cards = [
         {"label": "Respect Gained", "value": total_respect_gain, "cls": "good"},
@@ -1033,20 +1265,20 @@ def _live_summary_payload(user: Dict[str, Any]) -> Dict[str, Any]:
         },
         "rows": rows,
         "top_five": {
-            "top_hitters": top_hitters[:5],
-            "top_respect_gain": top_respect_gain[:5],
-            "top_respect_lost": top_respect_lost[:5],
-            "top_hits_taken": top_hits_taken[:5],
-            "top_net_impact": top_net_impact[:5],
+            "top_hitters": top_hitters,
+            "top_respect_gain": top_respect_gain,
+            "top_respect_lost": top_respect_lost,
+            "top_hits_taken": top_hits_taken,
+            "top_net_impact": top_net_impact,
             "no_shows": no_shows[:5],
             "recovering_soon": [],
         },
         "alerts": {
             "no_shows": no_shows[:5],
-            "bleeding": top_respect_lost[:5],
-            "under_fire": top_hits_taken[:5],
+            "bleeding": top_respect_lost,
+            "under_fire": top_hits_taken,
             "recovering_soon": [],
-            "carrying": top_net_impact[:5],
+            "carrying": top_net_impact,
         },
         "trend": {
             "last_15m": overall,
@@ -1072,32 +1304,62 @@ def _live_summary_payload(user: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+# /health and / are hit by keep-alive probes and never change, so the status
+# body and the static file lookups are resolved once. A fresh Response is
+# still returned because after_request adds per-request CORS headers to it.
+_STATUS_BODY = _serialize_ok({"status": "ok", "app": APP_NAME})
+_STATIC_DIR = os.path.join(app.root_path, "static")
+_HAS_INDEX_HTML = os.path.exists(os.path.join(_STATIC_DIR, "index.html"))
+_HAS_FAVICON = os.path.exists(os.path.join(_STATIC_DIR, "favicon.ico"))
+
+
+# The userscript and stylesheet are compressed once at import; send_from_directory
+# streams files, so _maybe_gzip would otherwise ship them uncompressed. The
+# etag is taken from the file itself so clients revalidating it get a 304.
+def _load_static_gzip() -> Dict[str, Tuple[bytes, str]]:
+    out: Dict[str, Tuple[bytes, str]] = {}
+    if not os.path.isdir(_STATIC_DIR):
+        return out
+    for name in os.listdir(_STATIC_DIR):
+        if not name.endswith((".js", ".css", ".html")):
+            continue
+        with open(os.path.join(_STATIC_DIR, name), "rb") as fh:
+            raw = fh.read()
+        out[name] = (gzip.compress(raw, compresslevel=9), hashlib.blake2b(raw, digest_size=8).hexdigest())
+    return out
+
+
+_STATIC_GZIP = _load_static_gzip()
+
+
 @app.route("/health", methods=["GET"])
 def health():
-    return ok(status="ok", app=APP_NAME)
+    return app.response_class(_STATUS_BODY, mimetype="application/json")
 
 
 @app.route("/", methods=["GET"])
 def index():
-    static_dir = app.static_folder or "static"
-    index_path = os.path.join(static_dir, "index.html")
-    if os.path.exists(index_path):
-        return send_from_directory(static_dir, "index.html")
-    return ok(app=APP_NAME, status="ok")
+    if _HAS_INDEX_HTML:
+        return send_from_directory(_STATIC_DIR, "index.html")
+    return app.response_class(_STATUS_BODY, mimetype="application/json")
 
 
 @app.route("/favicon.ico", methods=["GET"])
 def favicon():
-    static_dir = app.static_folder or "static"
-    favicon_path = os.path.join(static_dir, "favicon.ico")
-    if os.path.exists(favicon_path):
-        return send_from_directory(static_dir, "favicon.ico")
+    if _HAS_FAVICON:
+        return send_from_directory(_STATIC_DIR, "favicon.ico")
     return "", 204
 
 
 @app.route("/static/<path:path>", methods=["GET"])
 def static_files(path: str):
-    return send_from_directory(app.static_folder or "static", path)
+    gz_entry = _STATIC_GZIP.get(path)
+    if gz_entry is not None and request.accept_encodings["gzip"]:
+        resp = app.response_class(gz_entry[0], mimetype=mimetypes.guess_type(path)[0] or "application/octet-stream")
+        resp.headers["Content-Encoding"] = "gzip"
+        resp.set_etag(gz_entry[1], weak=True)
+        return resp.make_conditional(request)
+    return send_from_directory(_STATIC_DIR, path)
 
 
 @app.route("/api/ping", methods=["GET"])
@@ -1110,7 +1372,7 @@ def api_config():
     return ok(
         app_name=APP_NAME,
         default_refresh_seconds=DEFAULT_REFRESH_SECONDS,
-        base_url=BASE_URL(),
+        base_url=PUBLIC_BASE_URL,
     )
 
 
@@ -1140,11 +1402,11 @@ def api_auth():
         faction_id=faction_id,
         faction_name=faction_name,
     )
+    _invalidate_state_cache(user_id=user_id)
 
     delete_sessions_for_user(user_id)
     sess = create_session(user_id)
     user = get_user(user_id) or {}
-    access = _feature_access_for_user(user)
 
     add_audit_log(
         actor_user_id=user_id,
@@ -1153,9 +1415,14 @@ def api_auth():
         meta_json=f"faction_id={faction_id}",
     )
 
+    # The state build resolves access while the war chain runs on the pool,
+    # so our faction and the war are fetched side by side rather than one
+    # after the other.
     try:
         state_payload = _build_state_payload(user)
+        access = state_payload["access"]
     except Exception as e:
+        access = _feature_access_for_user(user)
         add_audit_log(
             actor_user_id=user_id,
             actor_name=name,
@@ -1217,7 +1484,21 @@ def api_logout():
 @app.route("/api/state", methods=["GET"])
 @require_session
 def api_state():
-    return ok(**_build_state_payload(request.user or {}))
+    user = request.user or {}
+    entry = _cached_state(user)
+    body = entry["body"]
+    gzipped = len(body) >= GZIP_MIN_BYTES and request.accept_encodings["gzip"]
+    if gzipped:
+        # Compressed once per cache entry rather than by after_request on
+        # every poll; racing requests at worst compress it twice.
+        body = _state_gzip_body(str(user.get("user_id") or "").strip(), entry)
+    resp = app.response_class(body, mimetype="application/json")
+    if gzipped:
+        resp.headers["Content-Encoding"] = "gzip"
+    # Weak because the after_request hook may gzip the body.
+    resp.set_etag(entry["etag"], weak=True)
+    resp.headers["Cache-Control"] = "private, no-cache"
+    return resp.make_conditional(request)
 
 
 @app.route("/api/overview/live", methods=["GET"])
@@ -1292,15 +1573,26 @@ def api_live_summary():
                 "generated_at": utc_now(),
                 "member_rows": 0,
             },
+            truncated=False,
         )
 
-    return ok(**_live_summary_payload(user))
+    summary = _cached_live_summary(user)
+    # Rows are only capped when the caller asks for ?limit=N; meta.member_rows
+    # keeps the full count. The cached payload is shared between requests, so
+    # slice into a copy.
+    limit = request.args.get("limit", 0, type=int)
+    truncated = limit > 0 and len(summary["rows"]) > limit
+    if truncated:
+        summary = {**summary, "rows": summary["rows"][:limit]}
+    return ok(**summary, truncated=truncated)
 
 
 @app.route("/api/notifications/seen", methods=["POST"])
 @require_session
 def api_notifications_seen():
-    mark_notifications_seen(str((request.user or {}).get("user_id") or ""))
+    user_id = str((request.user or {}).get("user_id") or "")
+    mark_notifications_seen(user_id)
+    _invalidate_state_cache(user_id=user_id)
     return ok(message="Notifications marked seen.")
 
 
@@ -1370,7 +1662,7 @@ def api_hospital():
             enemy_faction_name="",
         )
 
-    war = _build_war_payload(user)
+    war = _build_war_payload(user) or {}
     enemy_payload = _build_enemy_payload(user, war)
     hospital_payload = _build_hospital_payload(user, war, enemy_payload)
 
@@ -1384,10 +1676,10 @@ def api_hospital():
         enemy_faction_id=hospital_payload.get("enemy_faction_id") or "",
         enemy_faction_name=hospital_payload.get("enemy_faction_name") or "",
         war={
-            "war_id": str((war or {}).get("war_id") or ""),
-            "active": bool((war or {}).get("active")),
-            "registered": bool((war or {}).get("registered")),
-            "phase": str((war or {}).get("phase") or "none"),
+            "war_id": str(war.get("war_id") or ""),
+            "active": bool(war.get("active")),
+            "registered": bool(war.get("registered")),
+            "phase": str(war.get("phase") or "none"),
             "enemy_faction_id": hospital_payload.get("enemy_faction_id") or "",
             "enemy_faction_name": hospital_payload.get("enemy_faction_name") or "",
         },
@@ -1416,6 +1708,7 @@ def api_hospital_dibs_claim(enemy_user_id: str):
 
     if not result.get("ok"):
         return err(str(result.get("error") or "Could not dib enemy."), 400)
+    _invalidate_state_cache(faction_id=faction_id)
 
     hospital_payload = _build_hospital_payload(user, war, enemy_payload)
 
@@ -1520,6 +1813,7 @@ def api_meddeals_save():
         enemy_user_id=enemy_user_id,
         enemy_name=enemy_name,
     )
+    _invalidate_state_cache(faction_id=faction_id)
     return ok(message="Med deal saved.", item=item, **_build_med_deals_payload(user))
 
 
@@ -1532,6 +1826,7 @@ def api_meddeals_delete(enemy_user_id: str):
         return err("No faction found.", 400)
 
     delete_med_deal(faction_id=faction_id, enemy_user_id=str(enemy_user_id or "").strip())
+    _invalidate_state_cache(faction_id=faction_id)
     return ok(message="Med deal deleted.", enemy_user_id=str(enemy_user_id or "").strip(), **_build_med_deals_payload(user))
 
 
@@ -1560,6 +1855,7 @@ def api_chain_save():
         available=1 if _safe_bool(data.get("available")) else 0,
         sitter_enabled=1 if _safe_bool(data.get("sitter_enabled")) else 0,
     )
+    _invalidate_state_cache(faction_id=faction_id)
     war = _build_war_payload(user)
     payload = _build_chain_payload(user, war)
     return ok(message="Chain status updated.", item=item, **payload)
@@ -1597,29 +1893,57 @@ def api_terms_save():
         updated_by_user_id=str(user.get("user_id") or ""),
         updated_by_name=str(user.get("name") or ""),
     )
+    _invalidate_state_cache(faction_id=faction_id)
     return ok(message="Terms updated.", item=item)
 
 
-@app.route("/api/faction/members", methods=["GET"])
-@require_session
-def api_faction_members():
-    user = request.user or {}
+def _faction_members_payload(user: Dict[str, Any]) -> Dict[str, Any]:
     faction_id = str(user.get("faction_id") or "").strip()
     faction_name = str(user.get("faction_name") or "").strip()
     items, debug = _build_live_faction_members(user, return_debug=True)
     viewer_user_id = str(user.get("user_id") or "")
     viewer_row = next((x for x in items if str(x.get("user_id") or "") == viewer_user_id), {})
-    return ok(
-        faction_id=faction_id,
-        faction_name=faction_name,
-        items=items,
-        count=len(items),
-        source="api_faction_members_single_path",
-        viewer_user_id=viewer_user_id,
-        viewer_source=(viewer_row.get("source") if isinstance(viewer_row, dict) else "") or "",
-        viewer_live_bar_debug=(viewer_row.get("live_bar_debug") if isinstance(viewer_row, dict) else {}) or {},
-        debug=debug,
-    )
+    return {
+        "faction_id": faction_id,
+        "faction_name": faction_name,
+        "items": items,
+        "count": len(items),
+        "source": "api_faction_members_single_path",
+        "viewer_user_id": viewer_user_id,
+        "viewer_source": (viewer_row.get("source") if isinstance(viewer_row, dict) else "") or "",
+        "viewer_live_bar_debug": (viewer_row.get("live_bar_debug") if isinstance(viewer_row, dict) else {}) or {},
+        "debug": debug,
+    }
+
+
+def _cached_faction_members(user: Dict[str, Any]) -> Dict[str, Any]:
+    user_id = str(user.get("user_id") or "").strip()
+    if not user_id or CACHE_TTL_STATE <= 0:
+        return _state_cache_entry(user, _serialize_ok(_faction_members_payload(user)), 0.0)
+
+    now = time.monotonic()
+    entry = _FACTION_MEMBERS_CACHE.get(user_id)
+    if entry and entry["expires_at"] > now:
+        return entry
+
+    generation = _state_generation(user)
+    entry = _state_cache_entry(user, _serialize_ok(_faction_members_payload(user)), now + CACHE_TTL_STATE)
+    with _STATE_CACHE_LOCK:
+        for key in [k for k, v in _FACTION_MEMBERS_CACHE.items() if v["expires_at"] <= now]:
+            _FACTION_MEMBERS_CACHE.pop(key, None)
+        if _state_generation(user) == generation:
+            _FACTION_MEMBERS_CACHE[user_id] = entry
+    return entry
+
+
+@app.route("/api/faction/members", methods=["GET"])
+@require_session
+def api_faction_members():
+    entry = _cached_faction_members(request.user or {})
+    resp = app.response_class(entry["body"], mimetype="application/json")
+    resp.set_etag(entry["etag"], weak=True)
+    resp.headers["Cache-Control"] = "private, no-cache"
+    return resp.make_conditional(request)
 
 
 @app.route("/api/faction/members/<member_user_id>/access", methods=["POST"])
@@ -1658,6 +1982,7 @@ def api_faction_member_access(member_user_id: str):
             position=position,
         )
 
+    _invalidate_state_cache(faction_id=faction_id)
     return ok(message="Member access updated.", item=item)
 
 
@@ -1681,6 +2006,7 @@ def api_faction_member_activate(member_user_id: str):
         position=str(data.get("position") or "").strip(),
     )
 
+    _invalidate_state_cache(faction_id=faction_id)
     return ok(message="Member activated.", item=item)
 
 
@@ -1693,6 +2019,7 @@ def api_faction_member_delete(member_user_id: str):
     row = get_faction_member_access(faction_id, str(member_user_id))
     if row:
         delete_faction_member_access(faction_id=faction_id, member_user_id=str(member_user_id))
+        _invalidate_state_cache(faction_id=faction_id)
 
     return ok(message="Member removed.", member_user_id=str(member_user_id))
 
@@ -1725,7 +2052,7 @@ def api_admin_dashboard():
 @app.route("/api/admin/top-five", methods=["GET"])
 @require_admin
 def api_admin_top_five():
-    live = _live_summary_payload(request.user or {})
+    live = _cached_live_summary(request.user or {})
     top_five = live.get("top_five") or {}
     return ok(
         top_hitters=top_five.get("top_hitters") or [],
@@ -1753,12 +2080,15 @@ def handle_error(e):
     return err("Unhandled error.", 500, details=str(e))
 
 
+# gunicorn imports app:app directly and never calls create_app(), so the
+# schema is set up once per process here instead of per request.
+init_db()
+
+
 def create_app():
-    init_db()
     return app
 
 
 if __name__ == "__main__":
-    init_db()
     port = int(os.getenv("PORT", "5000"))
     app.run(host="0.0.0.0", port=port, debug=False)
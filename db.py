@@ -1,10 +1,35 @@
 import os
 import secrets
 import sqlite3
+import threading
+import time
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
 DB_PATH = os.getenv("DB_PATH", "war_hub.db")
+API_CACHE_PURGE_SECONDS = int(os.getenv("API_CACHE_PURGE_SECONDS", "300"))
+SESSION_TOUCH_SECONDS = int(os.getenv("SESSION_TOUCH_SECONDS", "60"))
+
+_last_cache_purge_ts = 0
+_parent_dir_ready = False
+
+# Every authenticated request touches its session; last_seen_at only needs
+# minute precision, so the write is skipped if this process did it recently.
+_SESSION_TOUCHED: Dict[str, float] = {}
+_SESSION_TOUCHED_LOCK = threading.Lock()
+
+# chain_statuses only changes through upsert_chain_status, so each faction's
+# list is kept in memory and dropped on write. The version guards against a
+# read that raced a write storing rows that are already stale.
+_CHAIN_STATUS_CACHE: Dict[str, List[Dict[str, Any]]] = {}
+_CHAIN_STATUS_LOCK = threading.Lock()
+_chain_status_version = 0
+
+# med_deals is cached the same way; upsert_med_deal and delete_med_deal are
+# its only writers.
+_MED_DEALS_CACHE: Dict[str, List[Dict[str, Any]]] = {}
+_MED_DEALS_LOCK = threading.Lock()
+_med_deals_version = 0
 
 
 def _utc_now_dt() -> datetime:
@@ -26,9 +51,17 @@ def _ensure_parent_dir(path: str):
 
 
 def _con():
-    _ensure_parent_dir(DB_PATH)
+    global _parent_dir_ready
+    # Every query opens its own connection; the directory only needs
+    # checking the first time.
+    if not _parent_dir_ready:
+        _ensure_parent_dir(DB_PATH)
+        _parent_dir_ready = True
     con = sqlite3.connect(DB_PATH, timeout=30, check_same_thread=False)
     con.row_factory = sqlite3.Row
+    # WAL (set in init_db) is crash-safe at NORMAL, which syncs on checkpoint
+    # instead of on every commit.
+    con.execute("PRAGMA synchronous=NORMAL")
     return con
 
 
@@ -70,6 +103,10 @@ def init_db():
     con = _con()
     cur = con.cursor()
 
+    # Readers no longer block on the chain/session/dibs writes every poll
+    # makes. The mode is stored in the database file, so this sticks.
+    cur.execute("PRAGMA journal_mode=WAL")
+
     cur.execute(
         """
         CREATE TABLE IF NOT EXISTS users (
@@ -354,9 +391,17 @@ def get_session(token: str) -> Optional[Dict[str, Any]]:
 
 
 def touch_session(token: str):
+    token = _clean_text(token)
+    now = time.monotonic()
+    with _SESSION_TOUCHED_LOCK:
+        if now - _SESSION_TOUCHED.get(token, -SESSION_TOUCH_SECONDS) < SESSION_TOUCH_SECONDS:
+            return
+        for stale in [k for k, v in _SESSION_TOUCHED.items() if now - v >= SESSION_TOUCH_SECONDS]:
+            _SESSION_TOUCHED.pop(stale, None)
+        _SESSION_TOUCHED[token] = now
     con = _con()
     cur = con.cursor()
-    cur.execute("UPDATE sessions SET last_seen_at = ? WHERE token = ?", (_utc_now(), _clean_text(token)))
+    cur.execute("UPDATE sessions SET last_seen_at = ? WHERE token = ?", (_utc_now(), token))
     con.commit()
     con.close()
 
@@ -426,10 +471,18 @@ def cache_get(cache_key: str):
 
 
 def cache_set(cache_key: str, payload_text: str, ttl_seconds: int):
-    now = _utc_now()
-    expires_at = int(_utc_now_dt().timestamp()) + int(max(0, ttl_seconds or 0))
+    global _last_cache_purge_ts
+    now_dt = _utc_now_dt()
+    now = now_dt.isoformat()
+    now_ts = int(now_dt.timestamp())
+    expires_at = now_ts + int(max(0, ttl_seconds or 0))
     con = _con()
     cur = con.cursor()
+    # Rows are only ever overwritten by key, so expired ones would pile up
+    # forever; sweep them out every few minutes.
+    if now_ts - _last_cache_purge_ts >= API_CACHE_PURGE_SECONDS:
+        _last_cache_purge_ts = now_ts
+        cur.execute("DELETE FROM api_cache WHERE expires_at_ts <= ?", (now_ts,))
     cur.execute(
         """
         INSERT INTO api_cache (cache_key, payload_text, expires_at_ts, created_at, updated_at)
@@ -724,6 +777,7 @@ def get_chain_status(faction_id: str, user_id: str) -> Optional[Dict[str, Any]]:
 
 
 def upsert_chain_status(faction_id: str, faction_name: str = "", user_id: str = "", user_name: str = "", available: Optional[bool] = None, sitter_enabled: Optional[bool] = None) -> Dict[str, Any]:
+    global _chain_status_version
     faction_id = _clean_text(faction_id)
     user_id = _clean_text(user_id)
     if not faction_id or not user_id:
@@ -749,6 +803,9 @@ def upsert_chain_status(faction_id: str, faction_name: str = "", user_id: str =
     )
     con.commit()
     con.close()
+    with _CHAIN_STATUS_LOCK:
+        _chain_status_version += 1
+        _CHAIN_STATUS_CACHE.pop(faction_id, None)
     return get_chain_status(faction_id, user_id) or {}
 
 
@@ -756,11 +813,19 @@ def list_chain_statuses(faction_id: str) -> List[Dict[str, Any]]:
     faction_id = _clean_text(faction_id)
     if not faction_id:
         return []
+    with _CHAIN_STATUS_LOCK:
+        cached = _CHAIN_STATUS_CACHE.get(faction_id)
+        version = _chain_status_version
+    if cached is not None:
+        return [dict(r) for r in cached]
     con = _con()
     cur = con.cursor()
     cur.execute("SELECT * FROM chain_statuses WHERE faction_id = ? ORDER BY LOWER(COALESCE(NULLIF(user_name, ''), user_id)) ASC", (faction_id,))
     rows = [dict(r) for r in cur.fetchall()]
     con.close()
+    with _CHAIN_STATUS_LOCK:
+        if version == _chain_status_version:
+            _CHAIN_STATUS_CACHE[faction_id] = [dict(r) for r in rows]
     return rows
 
 
@@ -777,6 +842,13 @@ def get_med_deal(faction_id: str, user_id: str) -> Optional[Dict[str, Any]]:
     return _row_to_dict(row)
 
 
+def _drop_med_deals_cache(faction_id: str):
+    global _med_deals_version
+    with _MED_DEALS_LOCK:
+        _med_deals_version += 1
+        _MED_DEALS_CACHE.pop(faction_id, None)
+
+
 def upsert_med_deal(faction_id: str, faction_name: str = "", user_id: str = "", user_name: str = "", enemy_user_id: str = "", enemy_name: str = "") -> Dict[str, Any]:
     faction_id = _clean_text(faction_id)
     user_id = _clean_text(user_id)
@@ -801,6 +873,7 @@ def upsert_med_deal(faction_id: str, faction_name: str = "", user_id: str = "",
     )
     con.commit()
     con.close()
+    _drop_med_deals_cache(faction_id)
     return get_med_deal(faction_id, user_id) or {}
 
 
@@ -808,11 +881,19 @@ def list_med_deals(faction_id: str) -> List[Dict[str, Any]]:
     faction_id = _clean_text(faction_id)
     if not faction_id:
         return []
+    with _MED_DEALS_LOCK:
+        cached = _MED_DEALS_CACHE.get(faction_id)
+        version = _med_deals_version
+    if cached is not None:
+        return [dict(r) for r in cached]
     con = _con()
     cur = con.cursor()
     cur.execute("SELECT * FROM med_deals WHERE faction_id = ? ORDER BY LOWER(COALESCE(NULLIF(user_name, ''), user_id)) ASC", (faction_id,))
     rows = [dict(r) for r in cur.fetchall()]
     con.close()
+    with _MED_DEALS_LOCK:
+        if version == _med_deals_version:
+            _MED_DEALS_CACHE[faction_id] = [dict(r) for r in rows]
     return rows
 
 
@@ -835,17 +916,12 @@ def delete_med_deal(faction_id: str, user_id: str = "", enemy_user_id: str = "")
         return
     con.commit()
     con.close()
+    _drop_med_deals_cache(faction_id)
 
 
 # hospital dibs
 
-def _hospital_dibs_cleanup_for_faction(faction_id: str):
-    faction_id = _clean_text(faction_id)
-    if not faction_id:
-        return
-    now_ts = _utc_now_ts()
-    con = _con()
-    cur = con.cursor()
+def _delete_expired_hospital_dibs(cur, faction_id: str, now_ts: int):
     cur.execute(
         """
         DELETE FROM hospital_dibs
@@ -856,6 +932,15 @@ def _hospital_dibs_cleanup_for_faction(faction_id: str):
         """,
         (faction_id, now_ts),
     )
+
+
+def _hospital_dibs_cleanup_for_faction(faction_id: str):
+    faction_id = _clean_text(faction_id)
+    if not faction_id:
+        return
+    con = _con()
+    cur = con.cursor()
+    _delete_expired_hospital_dibs(cur, faction_id, _utc_now_ts())
     con.commit()
     con.close()
 
@@ -878,9 +963,14 @@ def list_hospital_dibs(faction_id: str, include_recent: bool = False) -> List[Di
     if not faction_id:
         return []
     _hospital_dibs_cleanup_for_faction(faction_id)
-    now_ts = _utc_now_ts()
     con = _con()
     cur = con.cursor()
+    rows = _select_hospital_dibs(cur, faction_id, include_recent, _utc_now_ts())
+    con.close()
+    return rows
+
+
+def _select_hospital_dibs(cur, faction_id: str, include_recent: bool, now_ts: int) -> List[Dict[str, Any]]:
     if include_recent:
         cur.execute(
             """
@@ -897,9 +987,7 @@ def list_hospital_dibs(faction_id: str, include_recent: bool = False) -> List[Di
         )
     else:
         cur.execute("SELECT * FROM hospital_dibs WHERE faction_id = ? AND in_hospital = 1 ORDER BY LOWER(enemy_name), enemy_user_id", (faction_id,))
-    rows = [_row_to_dict(r) or {} for r in cur.fetchall()]
-    con.close()
-    return rows
+    return [_row_to_dict(r) or {} for r in cur.fetchall()]
 
 
 def sync_hospital_dibs_snapshot(
@@ -913,23 +1001,32 @@ def sync_hospital_dibs_snapshot(
     if not faction_id:
         return []
 
-    now = _utc_now()
-    now_ts = _utc_now_ts()
-    members = list(members or [])
+    now_dt = _utc_now_dt()
+    now = now_dt.isoformat()
+    now_ts = int(now_dt.timestamp())
+    faction_name = _clean_text(faction_name)
+    enemy_faction_id = _clean_text(enemy_faction_id)
+    enemy_faction_name = _clean_text(enemy_faction_name)
     current_ids = set()
+    upsert_rows = []
 
-    con = _con()
-    cur = con.cursor()
-
-    for member in members:
+    for member in members or []:
         enemy_user_id = _clean_text(member.get("user_id"))
         if not enemy_user_id:
             continue
         current_ids.add(enemy_user_id)
-        enemy_name = _clean_text(member.get("name"))
-        hospital_until_ts = _to_int(member.get("hospital_until_ts"), 0)
+        upsert_rows.append((
+            faction_id, faction_name, enemy_faction_id, enemy_faction_name, enemy_user_id,
+            _clean_text(member.get("name")), _to_int(member.get("hospital_until_ts"), 0), now, now, now,
+        ))
 
-        cur.execute(
+    # The whole snapshot (upserts, departures, expiry and the re-read) runs on
+    # one connection and commits once, since this is called on every poll.
+    con = _con()
+    cur = con.cursor()
+
+    if upsert_rows:
+        cur.executemany(
             """
             INSERT INTO hospital_dibs (
                 faction_id, faction_name, enemy_faction_id, enemy_faction_name, enemy_user_id, enemy_name,
@@ -951,16 +1048,20 @@ def sync_hospital_dibs_snapshot(
                 last_seen_in_hospital_at = excluded.last_seen_in_hospital_at,
                 updated_at = excluded.updated_at
             """,
-            (faction_id, _clean_text(faction_name), _clean_text(enemy_faction_id), _clean_text(enemy_faction_name), enemy_user_id, enemy_name, hospital_until_ts, now, now, now),
+            upsert_rows,
         )
 
     cur.execute("SELECT enemy_user_id, dibbed_by_user_id, left_hospital_at FROM hospital_dibs WHERE faction_id = ? AND in_hospital = 1", (faction_id,))
+    left_rows = []
     for row in cur.fetchall():
         enemy_user_id = _clean_text(row["enemy_user_id"])
         if enemy_user_id in current_ids:
             continue
         dibbed_by_user_id = _clean_text(row["dibbed_by_user_id"])
-        cur.execute(
+        left_rows.append((now, dibbed_by_user_id, now_ts + 30, dibbed_by_user_id, now_ts + 45, now, faction_id, enemy_user_id))
+
+    if left_rows:
+        cur.executemany(
             """
             UPDATE hospital_dibs
             SET in_hospital = 0,
@@ -970,13 +1071,14 @@ def sync_hospital_dibs_snapshot(
                 updated_at = ?
             WHERE faction_id = ? AND enemy_user_id = ?
             """,
-            (now, dibbed_by_user_id, now_ts + 30, dibbed_by_user_id, now_ts + 45, now, faction_id, enemy_user_id),
+            left_rows,
         )
 
+    _delete_expired_hospital_dibs(cur, faction_id, now_ts)
     con.commit()
+    rows = _select_hospital_dibs(cur, faction_id, True, now_ts)
     con.close()
-    _hospital_dibs_cleanup_for_faction(faction_id)
-    return list_hospital_dibs(faction_id, include_recent=True)
+    return rows
 
 
 def claim_hospital_dib(
@@ -993,8 +1095,9 @@ def claim_hospital_dib(
         return {"ok": False, "error": "Missing dibs details."}
 
     _hospital_dibs_cleanup_for_faction(faction_id)
-    now = _utc_now()
-    now_ts = _utc_now_ts()
+    now_dt = _utc_now_dt()
+    now = now_dt.isoformat()
+    now_ts = int(now_dt.timestamp())
 
     con = _con()
     cur = con.cursor()
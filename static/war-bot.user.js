@@ -1,7 +1,7 @@
 // ==UserScript==
 // @name         War and Chain ⚔️
 // @namespace    fries91-war-hub
-// @version      3.7.2
+// @version      3.7.4
 // @description  War and Chain by Fries91. Free-access rebuild with admin and leader/co-leader restrictions kept.
 // @match        https://www.torn.com/*
 // @match        https://torn.com/*
@@ -85,9 +85,13 @@
     // ============================================================
 
     var state = null;
+    var stateEtag = '';
+    var stateText = '';
     var analyticsCache = null;
     var adminTopFiveCache = null;
     var factionMembersCache = null;
+    var factionMembersEtag = '';
+    var factionMembersText = '';
     var currentFactionMembers = [];
     var liveSummaryCache = null;
     var liveSummaryLoading = false;
@@ -977,6 +981,12 @@
         }
     }
 
+    // Runs every second over every row; skipping identical writes keeps
+    // Online/Offline/Ready rows from dirtying layout on each tick.
+    function setTextIfChanged(el, text) {
+        if (el.textContent !== text) el.textContent = text;
+    }
+
     function tickMembersCountdowns() {
         if (!overlay) return;
         if (currentTab !== 'overview' && currentTab !== 'members' && currentTab !== 'hospital' && currentTab !== 'enemies') return;
@@ -987,7 +997,7 @@
             var renderedAt = Number(timerEl.getAttribute('data-chain-hit-rendered-at') || Date.now());
             var elapsedTimer = Math.floor((Date.now() - renderedAt) / 1000);
             var live = Math.max(0, base - elapsedTimer);
-            timerEl.textContent = 'Hit Timer: ' + (live > 0 ? formatCountdown(live) : 'Ready');
+            setTextIfChanged(timerEl, 'Hit Timer: ' + (live > 0 ? formatCountdown(live) : 'Ready'));
         });
 
         if (!membersLiveStamp) return;
@@ -1003,7 +1013,7 @@
             if (medEl) {
                 var baseMed = Number(row.getAttribute('data-medcd-base') || 0);
                 var liveMed = Math.max(0, baseMed - elapsed);
-                medEl.textContent = liveMed > 0 ? formatCountdown(liveMed) : 'Ready';
+                setTextIfChanged(medEl, liveMed > 0 ? formatCountdown(liveMed) : 'Ready');
             }
 
             var baseStatus = Number(row.getAttribute('data-statuscd-base') || 0);
@@ -1012,22 +1022,22 @@
 
             if (statusEl) {
                 if (stateName === 'hospital') {
-                    statusEl.textContent = liveStatus > 0 ? 'Hospital (' + formatCountdown(liveStatus) + ')' : 'Hospital';
+                    setTextIfChanged(statusEl, liveStatus > 0 ? 'Hospital (' + formatCountdown(liveStatus) + ')' : 'Hospital');
                 } else if (stateName === 'jail') {
-                    statusEl.textContent = liveStatus > 0 ? 'Jail (' + formatCountdown(liveStatus) + ')' : 'Jail';
+                    setTextIfChanged(statusEl, liveStatus > 0 ? 'Jail (' + formatCountdown(liveStatus) + ')' : 'Jail');
                 } else if (stateName === 'travel') {
-                    statusEl.textContent = liveStatus > 0 ? 'Travel (' + formatCountdown(liveStatus) + ')' : 'Travel';
+                    setTextIfChanged(statusEl, liveStatus > 0 ? 'Travel (' + formatCountdown(liveStatus) + ')' : 'Travel');
                 } else if (stateName === 'idle') {
-                    statusEl.textContent = 'Idle';
+                    setTextIfChanged(statusEl, 'Idle');
                 } else if (stateName === 'online') {
-                    statusEl.textContent = 'Online';
+                    setTextIfChanged(statusEl, 'Online');
                 } else {
-                    statusEl.textContent = 'Offline';
+                    setTextIfChanged(statusEl, 'Offline');
                 }
             }
 
             if (etaEl) {
-                etaEl.textContent = liveStatus > 0 ? formatCountdown(liveStatus) : 'Out now';
+                setTextIfChanged(etaEl, liveStatus > 0 ? formatCountdown(liveStatus) : 'Out now');
             }
         });
     }
@@ -1160,11 +1170,14 @@
                         json = null;
                     }
 
+                    var etag = /^etag:\s*(.*)$/im.exec(res.responseHeaders || '');
+
                     resolve({
                         ok: res.status >= 200 && res.status < 300,
                         status: res.status,
                         json: json,
-                        text: res.responseText || ''
+                        text: res.responseText || '',
+                        etag: etag ? etag[1].trim() : ''
                     });
                 },
                 onerror: function () {
@@ -1682,6 +1695,10 @@ function makeHoldDraggable(handle, target, key) {
     function doLogout() {
         GM_deleteValue(K_SESSION);
         state = null;
+        stateEtag = '';
+        stateText = '';
+        factionMembersEtag = '';
+        factionMembersText = '';
         currentFactionMembers = [];
         factionMembersCache = null;
         liveSummaryCache = null;
@@ -1725,11 +1742,30 @@ function _loadState() {
             return null;
         }
 
-        var res = yield authedReq('GET', '/api/state');
+        var res = yield authedReq('GET', '/api/state', null, stateEtag && stateText ? { 'If-None-Match': stateEtag } : null);
+        if (res.status === 304 && stateText) {
+            try {
+                res.json = JSON.parse(stateText);
+                res.ok = true;
+            } catch (_unused304) {
+                stateEtag = '';
+                stateText = '';
+                factionMembersEtag = '';
+                factionMembersText = '';
+            }
+        } else if (res.ok) {
+            stateEtag = res.etag || '';
+            stateText = stateEtag ? res.text : '';
+        }
+
         if (!res.ok) {
             if (res.status === 401 || res.status === 403) {
                 GM_deleteValue(K_SESSION);
                 state = null;
+                stateEtag = '';
+                stateText = '';
+                factionMembersEtag = '';
+                factionMembersText = '';
                 currentFactionMembers = [];
                 factionMembersCache = [];
                 warEnemiesCache = [];
@@ -1778,7 +1814,19 @@ function _loadFactionMembers() {
             return factionMembersCache.slice();
         }
 
-        var res = yield authedReq('GET', '/api/faction/members');
+        var res = yield authedReq('GET', '/api/faction/members', null, factionMembersEtag && factionMembersText ? { 'If-None-Match': factionMembersEtag } : null);
+        if (res.status === 304 && factionMembersText) {
+            try {
+                res.json = JSON.parse(factionMembersText);
+                res.ok = true;
+            } catch (_unused304) {
+                factionMembersEtag = '';
+                factionMembersText = '';
+            }
+        } else if (res.ok) {
+            factionMembersEtag = res.etag || '';
+            factionMembersText = factionMembersEtag ? res.text : '';
+        }
 
         if (!res.ok || !res.json || typeof res.json !== 'object') {
             factionMembersCache = [];
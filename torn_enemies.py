@@ -1,19 +1,35 @@
+import threading
 import time
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
 from torn_shared import (
     API_BASE,
     CACHE_TTL_FACTION_BASIC,
+    ROWS_MEMO_FACTIONS,
     safe_get,
     to_int,
 )
-from torn_status import normalize_member
+from torn_status import MemberTiming, member_parts, member_with_timers
 
+# Card order: online, idle, travel, hospital, then everything else.
+_CARD_STATE_RANK = {"online": 0, "idle": 1, "travel": 2, "hospital": 3}
 
-def hospital_members_from_enemies(enemies: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+# safe_get returns the same payload object for as long as it is cached, so
+# the parsed member parts are kept next to it and only rebuilt when it
+# changes. Hospital timers, card order and the hospital list still come from
+# the current clock on every read. Only the most recently rebuilt
+# ROWS_MEMO_FACTIONS factions are kept.
+_EnemyRows = Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]
+_MemberParts = List[Tuple[Dict[str, Any], MemberTiming]]
+_ENEMY_ROWS_MEMO: Dict[str, Tuple[Any, _MemberParts]] = {}
+_ENEMY_ROWS_LOCK = threading.Lock()
+
+
+def hospital_members_from_enemies(enemies: List[Dict[str, Any]], now_ts: Optional[int] = None) -> List[Dict[str, Any]]:
     out: List[Dict[str, Any]] = []
     seen = set()
-    now_ts = int(time.time())
+    if now_ts is None:
+        now_ts = int(time.time())
 
     for member in list(enemies or []):
         if not isinstance(member, dict):
@@ -54,55 +70,45 @@ def hospital_members_from_enemies(enemies: List[Dict[str, Any]]) -> List[Dict[st
 def build_enemy_cards(enemies: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     cards: List[Dict[str, Any]] = []
 
-    for member in list(enemies or []):
-        if not isinstance(member, dict):
-            continue
-
-        user_id = str(
-            member.get("user_id")
-            or member.get("player_id")
-            or member.get("id")
-            or ""
-        ).strip()
-
+    # Rows come from member_with_timers, which already returns stripped string
+    # ids/text, a lowercased online_state and integer hospital timers.
+    for member in enemies:
+        user_id = member["user_id"]
         if not user_id:
             continue
 
         cards.append({
             "user_id": user_id,
-            "name": str(member.get("name") or "Unknown"),
-            "level": member.get("level", ""),
-            "position": member.get("position", ""),
-            "status": str(member.get("status") or ""),
-            "status_detail": str(member.get("status_detail") or ""),
-            "last_action": str(member.get("last_action") or ""),
-            "online_state": str(member.get("online_state") or "offline").strip().lower(),
-            "in_hospital": 1 if member.get("in_hospital") else 0,
-            "hospital_seconds": to_int(member.get("hospital_seconds"), 0),
-            "hospital_until_ts": to_int(member.get("hospital_until_ts"), 0),
-            "profile_url": str(member.get("profile_url") or ""),
-            "attack_url": str(member.get("attack_url") or ""),
-            "bounty_url": str(member.get("bounty_url") or ""),
+            "name": member["name"],
+            "level": member["level"],
+            "position": member["position"],
+            "status": member["status"],
+            "status_detail": member["status_detail"],
+            "last_action": member["last_action"],
+            "online_state": member["online_state"],
+            "in_hospital": member["in_hospital"],
+            "hospital_seconds": member["hospital_seconds"],
+            "hospital_until_ts": member["hospital_until_ts"],
+            "profile_url": member["profile_url"],
+            "attack_url": member["attack_url"],
+            "bounty_url": member["bounty_url"],
         })
 
-    cards.sort(
-        key=lambda x: (
-            x.get("online_state") != "online",
-            x.get("online_state") != "idle",
-            x.get("online_state") != "travel",
-            x.get("online_state") != "hospital",
-            str(x.get("name") or "").lower(),
-        )
-    )
+    # The user id tie-break gives each state the same order split_enemy_buckets
+    # sorts into, so presorted card lists can be bucketed without a re-sort.
+    cards.sort(key=lambda x: (_CARD_STATE_RANK.get(x["online_state"], 4), x["name"].lower(), x["user_id"]))
     return cards
 
 
-def _extract_enemy_members(payload: Any) -> List[Dict[str, Any]]:
+def _extract_enemy_member_parts(payload: Any) -> _MemberParts:
     if not isinstance(payload, dict):
         return []
 
+    # build_enemy_cards only reads the normalized fields, so the raw Torn keys
+    # are not copied into each row.
+
     raw_members = payload.get("members")
-    out: List[Dict[str, Any]] = []
+    out: _MemberParts = []
 
     # v2 style: members is a list
     if isinstance(raw_members, list):
@@ -110,30 +116,43 @@ def _extract_enemy_members(payload: Any) -> List[Dict[str, Any]]:
             if not isinstance(member, dict):
                 continue
 
-            uid = str(
-                member.get("user_id")
-                or member.get("player_id")
-                or member.get("id")
-                or ""
-            ).strip()
-
+            uid = member.get("user_id") or member.get("player_id") or member.get("id")
             if not uid:
                 continue
 
-            out.append(normalize_member(uid, member))
+            out.append(member_parts(uid, member, keep_raw=False))
         return out
 
     # v1 style: members is a dict keyed by user id
     if isinstance(raw_members, dict):
-        for uid, member in raw_members.items():
-            if not isinstance(member, dict):
-                continue
-            out.append(normalize_member(uid, member))
-        return out
+        return [
+            member_parts(uid, member, keep_raw=False)
+            for uid, member in raw_members.items()
+            if isinstance(member, dict)
+        ]
 
     return []
 
 
+def _enemy_rows(enemy_faction_id: str, payload: Any) -> _EnemyRows:
+    with _ENEMY_ROWS_LOCK:
+        memo = _ENEMY_ROWS_MEMO.get(enemy_faction_id)
+    if memo is not None and memo[0] is payload:
+        parts = memo[1]
+    else:
+        parts = _extract_enemy_member_parts(payload)
+        with _ENEMY_ROWS_LOCK:
+            _ENEMY_ROWS_MEMO.pop(enemy_faction_id, None)
+            _ENEMY_ROWS_MEMO[enemy_faction_id] = (payload, parts)
+            while len(_ENEMY_ROWS_MEMO) > ROWS_MEMO_FACTIONS:
+                _ENEMY_ROWS_MEMO.pop(next(iter(_ENEMY_ROWS_MEMO)))
+    # One clock reading for the timers and the hospital filter.
+    now_ts = int(time.time())
+    members = [member_with_timers(row, timing, now_ts) for row, timing in parts]
+    cards = build_enemy_cards(members)
+    return members, cards, hospital_members_from_enemies(cards, now_ts)
+
+
 def _extract_enemy_root(payload: Any) -> Dict[str, Any]:
     if not isinstance(payload, dict):
         return {}
@@ -200,7 +219,7 @@ def enemy_faction_members(api_key: str, enemy_faction_id: str) -> Dict[str, Any]
 
     payload = res.get("data") or {}
     root = _extract_enemy_root(payload)
-    members = _extract_enemy_members(payload)
+    members, cards, hospital = _enemy_rows(enemy_faction_id, payload)
 
     resolved_enemy_faction_id = str(
         root.get("ID")
@@ -250,9 +269,6 @@ def enemy_faction_members(api_key: str, enemy_faction_id: str) -> Dict[str, Any]
             "debug_attempts": debug_attempts,
         }
 
-    cards = build_enemy_cards(members)
-    hospital = hospital_members_from_enemies(cards)
-
     return {
         "ok": True,
         "enemy_faction_id": resolved_enemy_faction_id or enemy_faction_id,
@@ -265,7 +281,7 @@ def enemy_faction_members(api_key: str, enemy_faction_id: str) -> Dict[str, Any]
     }
 
 
-def split_enemy_buckets(enemies: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+def split_enemy_buckets(enemies: List[Dict[str, Any]], presorted: bool = False) -> Dict[str, List[Dict[str, Any]]]:
     buckets = {
         "online": [],
         "idle": [],
@@ -275,16 +291,16 @@ def split_enemy_buckets(enemies: List[Dict[str, Any]]) -> Dict[str, List[Dict[st
         "offline": [],
     }
 
-    for member in list(enemies or []):
-        if not isinstance(member, dict):
-            continue
-
-        state = str(member.get("online_state") or "offline").strip().lower()
-        if state not in buckets:
-            state = "offline"
-        buckets[state].append(member)
-
-    for key in buckets:
-        buckets[key].sort(key=lambda x: (str(x.get("name") or "").lower(), str(x.get("user_id") or "")))
+    members = [m for m in (enemies or []) if isinstance(m, dict)]
+    if not presorted:
+        members.sort(key=lambda x: (str(x.get("name") or "").lower(), str(x.get("user_id") or "")))
+
+    # online_state is already normalized by build_enemy_cards, so one sort up
+    # front keeps every bucket ordered without re-sorting each of them.
+    for member in members:
+        bucket = buckets.get(member.get("online_state"))
+        if bucket is None:
+            bucket = buckets["offline"]
+        bucket.append(member)
 
     return buckets
@@ -1,11 +1,20 @@
-from typing import Any, Dict, List
+import threading
+import time
+from typing import Any, Dict, List, Tuple
 
 from torn_shared import (
     API_BASE,
     CACHE_TTL_FACTION_BASIC,
+    ROWS_MEMO_FACTIONS,
     safe_get,
 )
-from torn_status import normalize_member
+from torn_status import MemberTiming, member_parts, member_with_timers
+
+# Same idea as the enemy roster memo: while safe_get keeps handing back the
+# same cached payload object, its parsed member parts are reused and only the
+# hospital timers are recomputed. Bounded like the enemy memo.
+_MEMBER_ROWS_MEMO: Dict[str, Tuple[Any, List[Tuple[Dict[str, Any], MemberTiming]]]] = {}
+_MEMBER_ROWS_LOCK = threading.Lock()
 
 
 def _api_v2_base() -> str:
@@ -60,16 +69,16 @@ def faction_basic(api_key: str, faction_id: str = "") -> Dict[str, Any]:
                 return node.get("members")
         return {}
 
-    def _extract_members(payload: Any) -> List[Dict[str, Any]]:
+    def _extract_member_parts(payload: Any) -> List[Tuple[Dict[str, Any], MemberTiming]]:
         raw_members = _extract_member_container(payload)
-        out: List[Dict[str, Any]] = []
+        out: List[Tuple[Dict[str, Any], MemberTiming]] = []
 
         if isinstance(raw_members, dict):
-            for uid, member in raw_members.items():
-                if not isinstance(member, dict):
-                    continue
-                out.append(normalize_member(uid, member))
-            return out
+            return [
+                member_parts(uid, member)
+                for uid, member in raw_members.items()
+                if isinstance(member, dict)
+            ]
 
         if isinstance(raw_members, list):
             for member in raw_members:
@@ -82,12 +91,19 @@ def faction_basic(api_key: str, faction_id: str = "") -> Dict[str, Any]:
                     or member.get("ID")
                     or ""
                 )
-                out.append(normalize_member(uid, member))
+                out.append(member_parts(uid, member))
             return out
 
         return out
 
-    res = safe_get(url, params, cache_seconds=CACHE_TTL_FACTION_BASIC, cache_prefix=source)
+    # /v2/faction resolves the faction from the key, so scope the cache entry
+    # to the requested faction rather than sharing it across every key.
+    res = safe_get(
+        url,
+        params,
+        cache_seconds=CACHE_TTL_FACTION_BASIC,
+        cache_prefix=f"{source}_{requested_faction_id}",
+    )
     if not res.get("ok"):
         last_error = str(res.get("error") or "Could not load faction.")
         return {
@@ -101,7 +117,19 @@ def faction_basic(api_key: str, faction_id: str = "") -> Dict[str, Any]:
 
     payload = res.get("data") or {}
     root = _extract_root(payload)
-    members = _extract_members(payload)
+    with _MEMBER_ROWS_LOCK:
+        memo = _MEMBER_ROWS_MEMO.get(requested_faction_id)
+    if memo is not None and memo[0] is payload:
+        parts = memo[1]
+    else:
+        parts = _extract_member_parts(payload)
+        with _MEMBER_ROWS_LOCK:
+            _MEMBER_ROWS_MEMO.pop(requested_faction_id, None)
+            _MEMBER_ROWS_MEMO[requested_faction_id] = (payload, parts)
+            while len(_MEMBER_ROWS_MEMO) > ROWS_MEMO_FACTIONS:
+                _MEMBER_ROWS_MEMO.pop(next(iter(_MEMBER_ROWS_MEMO)))
+    now_ts = int(time.time())
+    members = [member_with_timers(row, timing, now_ts) for row, timing in parts]
     resolved_faction_id = str(
         root.get("ID") or root.get("id") or root.get("faction_id") or requested_faction_id or ""
     ).strip()
@@ -1,6 +1,6 @@
 from typing import Any, Dict
 
-from torn_shared import API_BASE, safe_get
+from torn_shared import API_BASE, as_dict, safe_get
 
 
 def me_basic(api_key: str) -> Dict[str, Any]:
@@ -51,7 +51,7 @@ def me_basic(api_key: str) -> Dict[str, Any]:
             "faction_name": "",
         }
 
-    faction = data.get("faction") if isinstance(data.get("faction"), dict) else {}
+    faction = as_dict(data.get("faction"))
 
     player_id = str(
         data.get("player_id")
@@ -1,6 +1,6 @@
 from typing import Any, Dict
 
-from torn_shared import API_BASE, safe_get, to_int
+from torn_shared import API_BASE, as_dict, safe_get, to_int
 from torn_status import extract_medical_cooldown_seconds
 
 
@@ -177,26 +177,17 @@ def member_live_bars(api_key: str, user_id: str = "") -> Dict[str, Any]:
             },
         }
 
-    bars = data.get("bars") if isinstance(data.get("bars"), dict) else {}
-    status = data.get("status") if isinstance(data.get("status"), dict) else {}
-    last_action = data.get("last_action") if isinstance(data.get("last_action"), dict) else {}
-    cooldowns = data.get("cooldowns") if isinstance(data.get("cooldowns"), dict) else {}
+    bars = as_dict(data.get("bars"))
+    status = as_dict(data.get("status"))
+    last_action = as_dict(data.get("last_action"))
+    cooldowns = as_dict(data.get("cooldowns"))
 
     # Torn is returning life/energy/nerve/happy at the top level for this key,
     # not inside a bars object.
-    life = bars.get("life") if isinstance(bars.get("life"), dict) else {}
-    energy = bars.get("energy") if isinstance(bars.get("energy"), dict) else {}
-    nerve = bars.get("nerve") if isinstance(bars.get("nerve"), dict) else {}
-    happy = bars.get("happy") if isinstance(bars.get("happy"), dict) else {}
-
-    if not life and isinstance(data.get("life"), dict):
-        life = data.get("life") or {}
-    if not energy and isinstance(data.get("energy"), dict):
-        energy = data.get("energy") or {}
-    if not nerve and isinstance(data.get("nerve"), dict):
-        nerve = data.get("nerve") or {}
-    if not happy and isinstance(data.get("happy"), dict):
-        happy = data.get("happy") or {}
+    life = as_dict(bars.get("life")) or as_dict(data.get("life"))
+    energy = as_dict(bars.get("energy")) or as_dict(data.get("energy"))
+    nerve = as_dict(bars.get("nerve")) or as_dict(data.get("nerve"))
+    happy = as_dict(bars.get("happy")) or as_dict(data.get("happy"))
 
     medical_cooldown = extract_medical_cooldown_seconds(data)
     booster_cooldown = _extract_booster_cooldown_seconds(data)
@@ -229,7 +220,7 @@ def member_live_bars(api_key: str, user_id: str = "") -> Dict[str, Any]:
             "requested_user_id": requested_user_id,
             "resolved_user_id": resolved_user_id,
             "top_level_keys": sorted(list(data.keys())),
-            "bars_keys": sorted(list(bars.keys())) if isinstance(bars, dict) else [],
+            "bars_keys": sorted(bars.keys()),
             "life_raw": life,
             "energy_raw": energy,
             "nerve_raw": nerve,
@@ -238,7 +229,7 @@ def member_live_bars(api_key: str, user_id: str = "") -> Dict[str, Any]:
             "energy_out": energy_out,
             "nerve_out": nerve_out,
             "happy_out": happy_out,
-            "cooldowns_keys": sorted(list(cooldowns.keys())) if isinstance(cooldowns, dict) else [],
+            "cooldowns_keys": sorted(cooldowns.keys()),
             "medical_cooldown_raw": medical_cooldown,
             "booster_cooldown_raw": booster_cooldown,
         },
@@ -1,20 +1,41 @@
 import json
 import os
-from typing import Any, Dict, List
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
 import requests
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 API_BASE = str(os.getenv("TORN_API_BASE", "https://api.torn.com")).rstrip("/")
 TORN_TIMEOUT = int(os.getenv("TORN_TIMEOUT", "30"))
+TORN_CONNECT_TIMEOUT = int(os.getenv("TORN_CONNECT_TIMEOUT", "5"))
+TORN_STALE_SECONDS = int(os.getenv("TORN_STALE_SECONDS", "120"))
+TORN_POOL_SIZE = int(os.getenv("TORN_POOL_SIZE", "16"))
 CACHE_TTL_USER_PROFILE = int(os.getenv("CACHE_TTL_USER_PROFILE", "30"))
 CACHE_TTL_FACTION_BASIC = int(os.getenv("CACHE_TTL_FACTION_BASIC", "20"))
 CACHE_TTL_WAR_SUMMARY = int(os.getenv("CACHE_TTL_WAR_SUMMARY", "15"))
+MAX_ERROR_LENGTH = 300
+# Factions whose normalized roster rows are memoized next to their payload.
+ROWS_MEMO_FACTIONS = 16
 
 DEFAULT_HEADERS = {
     "User-Agent": "WarHub/1.0",
     "Accept": "application/json",
 }
 
+# One session for every Torn call so TCP/TLS connections to the API are kept
+# alive and reused between requests instead of reopened each time. The pool
+# is sized for web threads plus fetch workers calling Torn at once; requests'
+# default of 10 would drop the extra connections after each burst.
+_SESSION = requests.Session()
+_SESSION.headers.update(DEFAULT_HEADERS)
+_SESSION.mount("https://", requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=max(1, TORN_POOL_SIZE)))
+
 try:
     from db import cache_get, cache_set
 except Exception:
@@ -25,6 +46,45 @@ except Exception:
         return None
 
 
+def json_loads(raw: Any) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def json_dumps(data: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(data).decode("utf-8")
+    return json.dumps(data)
+
+
+# Process-local copy of recently fetched payloads, checked before the sqlite
+# cache. Entries are shared between callers and must be treated as read-only.
+# Expired entries are kept for TORN_STALE_SECONDS so a failed fetch can fall
+# back to the last good payload.
+_MEMORY_CACHE: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+_MEMORY_CACHE_LOCK = threading.Lock()
+
+
+def _memory_cache_get(key_name: str, allow_stale: bool = False) -> Optional[Dict[str, Any]]:
+    with _MEMORY_CACHE_LOCK:
+        entry = _MEMORY_CACHE.get(key_name)
+    if not entry:
+        return None
+    expires_at = entry[0] + TORN_STALE_SECONDS if allow_stale else entry[0]
+    if expires_at > time.monotonic():
+        return entry[1]
+    return None
+
+
+def _memory_cache_set(key_name: str, data: Dict[str, Any], ttl_seconds: int):
+    now = time.monotonic()
+    with _MEMORY_CACHE_LOCK:
+        for stale_key in [k for k, v in _MEMORY_CACHE.items() if v[0] + TORN_STALE_SECONDS <= now]:
+            _MEMORY_CACHE.pop(stale_key, None)
+        _MEMORY_CACHE[key_name] = (now + ttl_seconds, data)
+
+
 def cache_key(prefix: str, params: Dict[str, Any]) -> str:
     ordered = "&".join(f"{k}={params[k]}" for k in sorted(params.keys()))
     return f"{prefix}:{ordered}"
@@ -60,6 +120,22 @@ def as_list(value: Any) -> List[Any]:
     return value if isinstance(value, list) else []
 
 
+def _error_text(exc: Exception, params: Dict[str, Any]) -> str:
+    # requests puts the full URL, query string included, in its messages.
+    text = str(exc)
+    api_key = str(params.get("key") or "")
+    if api_key:
+        text = text.replace(api_key, "***")
+    return text[:MAX_ERROR_LENGTH]
+
+
+def _stale_or_error(key_name: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    stale = _memory_cache_get(key_name, allow_stale=True) if key_name else None
+    if stale is None:
+        return result
+    return {"ok": True, "data": stale, "cached": True, "stale": True, "error": result.get("error", "")}
+
+
 def safe_get(
     url: str,
     params: Dict[str, Any],
@@ -70,26 +146,31 @@ def safe_get(
 
     try:
         if cache_seconds > 0 and cache_prefix:
+            # The URL carries the faction/user id, so it has to be part of
+            # the key or different factions would share one cache entry.
             safe_params = {k: v for k, v in params.items() if k != "key"}
+            safe_params["url"] = url
             key_name = cache_key(cache_prefix, safe_params)
+            remembered = _memory_cache_get(key_name)
+            if remembered is not None:
+                return {"ok": True, "data": remembered, "cached": True}
             cached = cache_get(key_name)
             if cached:
                 try:
-                    data = json.loads(cached)
+                    data = json_loads(cached)
                     return {"ok": True, "data": data, "cached": True}
                 except Exception:
                     pass
 
-        response = requests.get(
+        response = _SESSION.get(
             url,
             params=params,
-            timeout=TORN_TIMEOUT,
-            headers=DEFAULT_HEADERS,
+            timeout=(TORN_CONNECT_TIMEOUT, TORN_TIMEOUT),
         )
         response.raise_for_status()
 
         try:
-            data = response.json()
+            data = json_loads(response.content)
         except Exception:
             return {
                 "ok": False,
@@ -110,15 +191,16 @@ def safe_get(
             err_obj = as_dict(data.get("error"))
             return {
                 "ok": False,
-                "error": str(err_obj.get("error") or "Torn API error"),
+                "error": str(err_obj.get("error") or "Torn API error")[:MAX_ERROR_LENGTH],
                 "error_code": err_obj.get("code"),
                 "data": data,
                 "status_code": response.status_code,
             }
 
         if cache_seconds > 0 and cache_prefix and key_name:
+            _memory_cache_set(key_name, data, cache_seconds)
             try:
-                cache_set(key_name, json.dumps(data), cache_seconds)
+                cache_set(key_name, json_dumps(data), cache_seconds)
             except Exception:
                 pass
 
@@ -131,28 +213,28 @@ def safe_get(
 
     except requests.HTTPError as e:
         status_code = getattr(e.response, "status_code", None)
-        return {
+        return _stale_or_error(key_name, {
             "ok": False,
             "error": f"HTTP error {status_code or ''}".strip(),
             "data": {},
             "status_code": status_code,
-        }
+        })
     except requests.Timeout:
-        return {
+        return _stale_or_error(key_name, {
             "ok": False,
             "error": "Request timed out.",
             "data": {},
-        }
+        })
     except requests.RequestException as e:
-        return {
+        return _stale_or_error(key_name, {
             "ok": False,
-            "error": str(e),
+            "error": _error_text(e, params),
             "data": {},
-        }
+        })
     except Exception as e:
         return {
             "ok": False,
-            "error": str(e),
+            "error": _error_text(e, params),
             "data": {},
         }
 
@@ -1,8 +1,25 @@
 import re
 import time
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple
 
-from torn_shared import attack_url, bounty_url, profile_url, to_int
+from torn_shared import as_dict, attack_url, bounty_url, profile_url, to_int
+
+_DURATION_RE = re.compile(r"(\d+)\s*([dhms])")
+_DIGITS_RE = re.compile(r"\d+")
+_DURATION_UNIT_SECONDS = {"d": 86400, "h": 3600, "m": 60, "s": 1}
+
+# Checked in order; the first keyword found in the last action text wins.
+_LAST_ACTION_STATES = (
+    ("hospital", ("hospital", "rehab")),
+    ("jail", ("jail", "jailed")),
+    ("travel", ("abroad", "traveling", "travelling", "travel", "flying")),
+    ("online", ("online", "active")),
+    ("idle", ("idle", "inactive")),
+)
+# Torn's own last_action statuses, answered without the keyword scan above.
+_LAST_ACTION_EXACT = {"online": "online", "idle": "idle", "offline": "offline"}
+# Jail and travel are reported in the status text rather than the last action.
+_STATUS_STATES = tuple(entry for entry in _LAST_ACTION_STATES if entry[0] in ("jail", "travel"))
 
 
 def extract_hospital_seconds_from_text(text: str) -> int:
@@ -10,29 +27,19 @@ def extract_hospital_seconds_from_text(text: str) -> int:
     if not s:
         return 0
 
-    total = 0
-    matches = re.findall(r"(\d+)\s*([dhms])", s)
+    matches = _DURATION_RE.findall(s)
     if matches:
-        for num, unit in matches:
-            n = int(num)
-            if unit == "d":
-                total += n * 86400
-            elif unit == "h":
-                total += n * 3600
-            elif unit == "m":
-                total += n * 60
-            elif unit == "s":
-                total += n
-        return total
-
-    maybe_digits = re.findall(r"\d+", s)
-    if maybe_digits and ("hospital" in s or "rehab" in s):
-        return int(maybe_digits[0]) * 60
+        return sum(int(num) * _DURATION_UNIT_SECONDS[unit] for num, unit in matches)
+
+    if "hospital" in s or "rehab" in s:
+        maybe_digits = _DIGITS_RE.search(s)
+        if maybe_digits:
+            return int(maybe_digits.group(0)) * 60
 
     return 0
 
 
-def extract_hospital_until_ts(member: Dict[str, Any], fallback_seconds: int = 0) -> int:
+def _hospital_until_candidates(member: Dict[str, Any]) -> Tuple[int, ...]:
     candidates = [
         member.get("until"),
         member.get("hospital_until"),
@@ -50,16 +57,27 @@ def extract_hospital_until_ts(member: Dict[str, Any], fallback_seconds: int = 0)
             status.get("time"),
         ])
 
-    now = int(time.time())
+    out = []
     for value in candidates:
         if isinstance(value, (int, float)):
-            ts = int(value)
-            if ts > now - 3600:
-                return ts
+            out.append(int(value))
         elif isinstance(value, str) and value.strip().isdigit():
-            ts = int(value.strip())
-            if ts > now - 3600:
-                return ts
+            out.append(int(value.strip()))
+    return tuple(out)
+
+
+def _recent_until_ts(candidates: Tuple[int, ...], now: int) -> int:
+    for ts in candidates:
+        if ts > now - 3600:
+            return ts
+    return 0
+
+
+def extract_hospital_until_ts(member: Dict[str, Any], fallback_seconds: int = 0, now_ts: Optional[int] = None) -> int:
+    now = int(time.time()) if now_ts is None else now_ts
+    ts = _recent_until_ts(_hospital_until_candidates(member), now)
+    if ts:
+        return ts
 
     if fallback_seconds > 0:
         return now + int(fallback_seconds)
@@ -71,19 +89,24 @@ def member_state_from_last_action(last_action_text: str) -> str:
     s = str(last_action_text or "").strip().lower()
     if not s:
         return "offline"
-    if any(x in s for x in ["hospital", "rehab"]):
-        return "hospital"
-    if any(x in s for x in ["jail", "jailed"]):
-        return "jail"
-    if any(x in s for x in ["abroad", "traveling", "travelling", "travel", "flying"]):
-        return "travel"
-    if any(x in s for x in ["online", "active"]):
-        return "online"
-    if any(x in s for x in ["idle", "inactive"]):
-        return "idle"
+    state = _LAST_ACTION_EXACT.get(s)
+    if state is not None:
+        return state
+    for state, keywords in _LAST_ACTION_STATES:
+        for keyword in keywords:
+            if keyword in s:
+                return state
     return "offline"
 
 
+def _status_state(status_lower: str) -> str:
+    for state, keywords in _STATUS_STATES:
+        for keyword in keywords:
+            if keyword in status_lower:
+                return state
+    return ""
+
+
 def extract_medical_cooldown_seconds(payload: Dict[str, Any]) -> int:
     if not isinstance(payload, dict):
         return 0
@@ -122,33 +145,31 @@ def extract_medical_cooldown_seconds(payload: Dict[str, Any]) -> int:
     return 0
 
 
-def _extract_bar(payload: Dict[str, Any], keys: list[str]) -> Dict[str, Any]:
-    for key in keys:
-        value = payload.get(key)
-        if isinstance(value, dict):
-            current = to_int(value.get("current", value.get("amount", value.get("full", 0))), 0)
-            maximum = to_int(value.get("maximum", value.get("max", value.get("total", value.get("full", 0)))), 0)
-            return {
-                "current": current,
-                "maximum": maximum,
-            }
-
-    bars = payload.get("bars")
-    if isinstance(bars, dict):
+def _bar_values(value: Dict[str, Any]) -> Dict[str, Any]:
+    full = value.get("full", 0)
+    return {
+        "current": to_int(value.get("current", value.get("amount", full)), 0),
+        "maximum": to_int(value.get("maximum", value.get("max", value.get("total", full))), 0),
+    }
+
+
+def _extract_bar(payload: Dict[str, Any], bars: Dict[str, Any], keys: tuple) -> Dict[str, Any]:
+    for source in (payload, bars):
         for key in keys:
-            value = bars.get(key)
+            value = source.get(key)
             if isinstance(value, dict):
-                current = to_int(value.get("current", value.get("amount", value.get("full", 0))), 0)
-                maximum = to_int(value.get("maximum", value.get("max", value.get("total", value.get("full", 0)))), 0)
-                return {
-                    "current": current,
-                    "maximum": maximum,
-                }
-
+                return _bar_values(value)
     return {}
 
 
-def normalize_member(uid: Any, member: Dict[str, Any]) -> Dict[str, Any]:
+# Everything in a normalized row except its hospital timers depends only on
+# the Torn payload. member_parts splits that part off so a roster can be
+# parsed once per payload and given fresh timers by member_with_timers on
+# every read.
+MemberTiming = Tuple[Tuple[int, ...], int, bool, str]
+
+
+def member_parts(uid: Any, member: Dict[str, Any], keep_raw: bool = True) -> Tuple[Dict[str, Any], MemberTiming]:
     member = member if isinstance(member, dict) else {}
 
     last_action_raw = member.get("last_action")
@@ -179,38 +200,29 @@ def normalize_member(uid: Any, member: Dict[str, Any]) -> Dict[str, Any]:
         status_text = str(status_raw or "")
         status_detail = ""
 
-    combined = " ".join([status_text, status_detail, last_action]).strip().lower()
+    status_lower = f"{status_text} {status_detail}".lower()
+    combined = f"{status_lower} {last_action.lower()}".strip()
 
-    hospital_seconds = extract_hospital_seconds_from_text(combined)
-    hospital_until_ts = extract_hospital_until_ts(member, hospital_seconds)
-    now_ts = int(time.time())
-
-    in_hospital = 1 if ("hospital" in combined or "rehab" in combined or hospital_until_ts > now_ts) else 0
-    if hospital_until_ts > now_ts and hospital_seconds <= 0:
-        hospital_seconds = max(0, hospital_until_ts - now_ts)
-
-    online_state = "hospital" if in_hospital else member_state_from_last_action(last_action)
-
-    if not in_hospital:
-        if any(x in combined for x in ["jail", "jailed"]):
-            online_state = "jail"
-        elif any(x in combined for x in ["abroad", "traveling", "travelling", "travel", "flying"]):
-            online_state = "travel"
-        elif "online" in combined or "active" in combined:
-            online_state = "online"
-        elif "idle" in combined:
-            online_state = "idle"
+    # Jail/travel come from the status text; otherwise the raw last action
+    # decides, which Torn sends as a bare Online/Idle/Offline the exact
+    # lookup answers without a keyword scan.
+    timing = (
+        _hospital_until_candidates(member),
+        extract_hospital_seconds_from_text(combined),
+        "hospital" in combined or "rehab" in combined,
+        _status_state(status_lower) or member_state_from_last_action(last_action),
+    )
 
     user_id = str(uid or member.get("user_id") or member.get("player_id") or member.get("id") or "").strip()
 
-    energy = _extract_bar(member, ["energy"])
-    life = _extract_bar(member, ["life", "hp"])
-    nerve = _extract_bar(member, ["nerve"])
-    happy = _extract_bar(member, ["happy"])
+    bars = as_dict(member.get("bars"))
+    energy = _extract_bar(member, bars, ("energy",))
+    life = _extract_bar(member, bars, ("life", "hp"))
+    nerve = _extract_bar(member, bars, ("nerve",))
+    happy = _extract_bar(member, bars, ("happy",))
     medical_cooldown = extract_medical_cooldown_seconds(member)
 
-    return {
-        **member,
+    row = {
         "user_id": user_id,
         "name": str(member.get("name") or member.get("player_name") or member.get("member_name") or "Unknown"),
         "level": member.get("level", ""),
@@ -218,10 +230,11 @@ def normalize_member(uid: Any, member: Dict[str, Any]) -> Dict[str, Any]:
         "status": status_text,
         "status_detail": status_detail,
         "last_action": last_action,
-        "online_state": online_state,
-        "in_hospital": in_hospital,
-        "hospital_seconds": hospital_seconds,
-        "hospital_until_ts": hospital_until_ts,
+        # Placeholders keep the key order; member_with_timers fills them.
+        "online_state": "",
+        "in_hospital": 0,
+        "hospital_seconds": 0,
+        "hospital_until_ts": 0,
         "energy": energy or member.get("energy") or {},
         "life": life or member.get("life") or {},
         "nerve": nerve or member.get("nerve") or {},
@@ -231,6 +244,45 @@ def normalize_member(uid: Any, member: Dict[str, Any]) -> Dict[str, Any]:
         "attack_url": attack_url(user_id),
         "bounty_url": bounty_url(user_id),
     }
+    if not keep_raw:
+        return row, timing
+    # Raw Torn keys first so the normalized fields win on any clash.
+    merged = dict(member)
+    merged.update(row)
+    return merged, timing
+
+
+def member_with_timers(row: Dict[str, Any], timing: MemberTiming, now_ts: int) -> Dict[str, Any]:
+    candidates, text_seconds, hospital_text, state = timing
+    hospital_until_ts = _recent_until_ts(candidates, now_ts)
+    if hospital_until_ts > now_ts:
+        # Torn's numeric until is exact; the description text only counts
+        # for rows that come without one.
+        hospital_seconds = hospital_until_ts - now_ts
+    else:
+        hospital_seconds = text_seconds
+        if not hospital_until_ts and hospital_seconds > 0:
+            hospital_until_ts = now_ts + hospital_seconds
+
+    in_hospital = 1 if (hospital_text or hospital_until_ts > now_ts) else 0
+
+    return {
+        **row,
+        "online_state": "hospital" if in_hospital else state,
+        "in_hospital": in_hospital,
+        "hospital_seconds": hospital_seconds,
+        "hospital_until_ts": hospital_until_ts,
+    }
+
+
+def normalize_member(
+    uid: Any,
+    member: Dict[str, Any],
+    keep_raw: bool = True,
+    now_ts: Optional[int] = None,
+) -> Dict[str, Any]:
+    row, timing = member_parts(uid, member, keep_raw)
+    return member_with_timers(row, timing, int(time.time()) if now_ts is None else now_ts)
 
 
 def coerce_hospital_member(member: Dict[str, Any]) -> Dict[str, Any]:
@@ -227,15 +227,13 @@ def _payload_matches_my_faction(payload: Dict[str, Any], my_faction_id: str = ""
         return False
 
     my_faction_id = str(my_faction_id or "").strip()
-    my_faction_name = str(my_faction_name or "").strip()
+    my_name_lower = stringify_lower(my_faction_name)
 
+    # _extract_factions already returns stripped string ids and names.
     for side in factions:
-        side_id = str(side.get("faction_id") or "").strip()
-        side_name = str(side.get("name") or "").strip()
-
-        if my_faction_id and side_id == my_faction_id:
+        if my_faction_id and side["faction_id"] == my_faction_id:
             return True
-        if my_faction_name and side_name and stringify_lower(side_name) == stringify_lower(my_faction_name):
+        if my_name_lower and side["name"] and side["name"].lower() == my_name_lower:
             return True
 
     return False
@@ -310,15 +308,14 @@ def _extract_ranked_war_payload(payload: Any, my_faction_id: str = "", my_factio
     if not candidates:
         return None
 
-    best = sorted(
+    best = max(
         candidates,
         key=lambda node: _score_ranked_war_candidate(
             node,
             my_faction_id=my_faction_id,
             my_faction_name=my_faction_name,
         ),
-        reverse=True,
-    )[0]
+    )
 
     return best
 
@@ -336,31 +333,27 @@ def _build_response(
 
     my_faction_id = str(my_faction_id or "").strip()
     my_faction_name = str(my_faction_name or "").strip()
+    my_name_lower = my_faction_name.lower()
 
     my_side = None
     for side in factions:
-        side_id = str(side.get("faction_id") or "").strip()
-        side_name = str(side.get("name") or "").strip()
-
-        if my_faction_id and side_id == my_faction_id:
+        if my_faction_id and side["faction_id"] == my_faction_id:
             my_side = side
             break
-        if my_faction_name and side_name and stringify_lower(side_name) == stringify_lower(my_faction_name):
+        if my_name_lower and side["name"] and side["name"].lower() == my_name_lower:
             my_side = side
             break
 
     enemy_side = None
     if my_side is not None:
-        my_side_id = str(my_side.get("faction_id") or "").strip()
-        my_side_name = str(my_side.get("name") or "").strip()
+        my_side_id = my_side["faction_id"]
+        my_side_name_lower = my_side["name"].lower()
 
         for side in factions:
-            side_id = str(side.get("faction_id") or "").strip()
-            side_name = str(side.get("name") or "").strip()
-
+            side_id = side["faction_id"]
             if my_side_id and side_id and side_id == my_side_id:
                 continue
-            if my_side_name and side_name and stringify_lower(side_name) == stringify_lower(my_side_name):
+            if my_side_name_lower and side["name"] and side["name"].lower() == my_side_name_lower:
                 continue
 
             enemy_side = side
@@ -376,10 +369,12 @@ def _build_response(
     if not active and start_ts and start_ts <= now_ts and (not end_ts or end_ts > now_ts):
         active = True
 
-    resolved_my_faction_id = str((my_side or {}).get("faction_id") or my_faction_id or "").strip()
-    resolved_my_faction_name = str((my_side or {}).get("name") or my_faction_name or "").strip()
-    resolved_enemy_faction_id = str((enemy_side or {}).get("faction_id") or "").strip()
-    resolved_enemy_faction_name = str((enemy_side or {}).get("name") or "").strip()
+    my_side = my_side or {}
+    enemy_side = enemy_side or {}
+    resolved_my_faction_id = str(my_side.get("faction_id") or my_faction_id or "").strip()
+    resolved_my_faction_name = str(my_side.get("name") or my_faction_name or "").strip()
+    resolved_enemy_faction_id = str(enemy_side.get("faction_id") or "").strip()
+    resolved_enemy_faction_name = str(enemy_side.get("name") or "").strip()
 
     if resolved_my_faction_id and resolved_enemy_faction_id and resolved_my_faction_id == resolved_enemy_faction_id:
         resolved_enemy_faction_id = ""
@@ -405,10 +400,10 @@ def _build_response(
         "enemy_faction_id": resolved_enemy_faction_id,
         "enemy_faction_name": resolved_enemy_faction_name,
         "enemy_members": [],
-        "score_us": to_int((my_side or {}).get("score"), 0),
-        "score_them": to_int((enemy_side or {}).get("score"), 0),
-        "chain_us": to_int((my_side or {}).get("chain"), 0),
-        "chain_them": to_int((enemy_side or {}).get("chain"), 0),
+        "score_us": to_int(my_side.get("score"), 0),
+        "score_them": to_int(enemy_side.get("score"), 0),
+        "chain_us": to_int(my_side.get("chain"), 0),
+        "chain_them": to_int(enemy_side.get("chain"), 0),
         "target_score": _extract_target_score(payload),
         "source_note": source_note,
         "debug_factions": factions,